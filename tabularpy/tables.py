@@ -1,29 +1,67 @@
 import inspect
-import locale
 import re
 from abc import ABCMeta
-from collections import Counter
+from collections import Counter, namedtuple
 from copy import deepcopy
-from csv import DictReader
-from datetime import timedelta
-from decimal import Decimal
-
-from . import Settings
+from csv import reader, writer
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from io import StringIO
+from itertools import chain, compress, repeat
+from json import JSONEncoder
+from os import PathLike
+
+from . import Settings, aggregate, expr, infer, join, sql
 from .cell import Cell
 from .col import Col
+from .index import INDEX_KINDS, SortedIndex
 from .row import Row
+from .storage import TYPECODES, TypedColumn
 from .util import (
+    ASC,
+    DESC,
     BeautifulSoupParser,
-    clean_value,
+    HtmlParser,
+    MemoDict,
+    avg_aggr,
+    chunked,
+    compile_converter,
+    compile_formatter,
+    count_aggr,
+    decimal_sum,
     find_duplicates,
+    get_result_types,
     get_sql_query_types,
-    getindexes,
     getitem,
-    merge_sort,
+    is_null,
+    json_default,
+    json_tokens,
+    sum_aggr,
     transpose,
+    unique_headers,
 )
 
-locale.setlocale(locale.LC_ALL, "")
+JSON_ORIENTS = ("records", "arrays", "columns", "ndjson")
+
+EXCEL_MAX_ROWS = 1048576
+
+# conversions applied to the values read from Excel for some guessed types
+_EXCEL_CONVERTERS = {
+    "interval": lambda value: (
+        timedelta(days=value * 24) if isinstance(value, (int, float)) else value
+    ),
+    "decimal": lambda value: Decimal(str(value)) if value is not None else None,
+}
+_EXCEL_CONVERTERS["numeric"] = _EXCEL_CONVERTERS["decimal"]
+
+# whether the low and high bounds are included for each range condition, None
+# meaning the condition has no bound on that side
+RANGE_CONDITIONS = {
+    ">": (False, None),
+    ">=": (True, None),
+    "<": (None, False),
+    "<=": (None, True),
+}
 
 
 class BaseTable(metaclass=ABCMeta):
@@ -38,6 +76,10 @@ class BaseTable(metaclass=ABCMeta):
         "_table_data",
         "column_types",
         "_settings",
+        "_converters",
+        "_converter_types",
+        "_indexes",
+        "_unverified",
     )
 
     def __init__(
@@ -57,6 +99,12 @@ class BaseTable(metaclass=ABCMeta):
             "column_types": {},
         }
         self._settings = settings or Settings()
+        self._converters = {}
+        self._converter_types = None
+        self._indexes = {}
+        # columns typed from a sample of their values, checked against all of
+        # them on the first full pass over the column
+        self._unverified = set()
         self._i = 0
 
     @classmethod
@@ -100,6 +148,8 @@ class BaseTable(metaclass=ABCMeta):
             self.format_cells(cf)
         if not all(list(self.column_types.values())):
             self.guess_types_from_data()
+        if self._settings.typed_columns:
+            self._type_columns()
 
     @property
     def totals(self):
@@ -130,10 +180,13 @@ class BaseTable(metaclass=ABCMeta):
                 self.headers.append(name)
             if col_type:
                 self.column_types[name] = col_type
+                self._unverified.discard(name)
             else:
                 self.column_types[name] = None
                 if self.num_rows:
                     self.guess_types_from_data()
+            if self._settings.typed_columns:
+                self._type_columns(name)
             self.num_cols += 1
         else:
             raise ValueError("shape of column does not match table")
@@ -144,6 +197,7 @@ class BaseTable(metaclass=ABCMeta):
             for row_header in row_headers:
                 if row_header not in self.headers:
                     raise ValueError(f"{row} contains columns not in table")
+            self._index_row(row.get, prepend)
             for header in self.headers:
                 if not prepend:
                     try:
@@ -158,6 +212,7 @@ class BaseTable(metaclass=ABCMeta):
             self.num_rows += 1
         elif isinstance(row, Row):
             if row.headers == self.headers:
+                self._index_row(lambda header: row[header].raw_value, prepend)
                 for cell in row:
                     self._table_data[cell.header].append(cell.raw_value)
                 self.num_rows += 1
@@ -166,9 +221,148 @@ class BaseTable(metaclass=ABCMeta):
         else:
             raise ValueError(f"{row} is not of type dict")
 
+    def _index_row(self, get_value, prepend):
+        """Checks a row about to be added against the unique indexes and adds
+        it to every index, or marks them stale when the row is prepended"""
+        keys = []
+        for header in self._indexes:
+            index = self._get_index(header)
+            key = self._clean_value(header, get_value(header))
+            index.check(key)
+            keys.append((index, key))
+        if prepend:
+            self._invalidate_indexes()
+            return
+        for index, key in keys:
+            index.add(key, self.num_rows)
+
+    def create_index(self, column, unique=False, kind="hash"):
+        """Keeps an index of the values in 'column' so equality filters,
+        lookup, pop_row and delete_by_column don't have to scan the table.
+        A "sorted" index also answers range filters, between, min and max.
+        A 'unique' index refuses rows that would duplicate a value."""
+        if not self._has_column(column):
+            raise AttributeError(f"{self} does not have column {column}")
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"{kind!r} is not a kind of index")
+        self._indexes[column] = INDEX_KINDS[kind](column, unique).build(self)
+        return self
+
+    def drop_index(self, column):
+        self._indexes.pop(column, None)
+        return self
+
+    def _get_index(self, column):
+        index = self._indexes.get(column)
+        if index is not None and index.stale:
+            index.build(self)
+        return index
+
+    def _invalidate_indexes(self, *headers):
+        for header in headers or self._indexes:
+            if header in self._indexes:
+                self._indexes[header].stale = True
+
+    def _clean_value(self, header, value):
+        if isinstance(value, Cell):
+            value = value.value
+        if header in self._unverified:
+            self._verify_type(header)
+        try:
+            return self._get_converters()[header](value)
+        except (TypeError, ValueError, InvalidOperation):
+            return value
+
+    def lookup(self, column, value):
+        """Returns the positions of the rows where 'column' equals 'value'"""
+        if not self._has_column(column):
+            raise AttributeError(f"{self} does not have column {column}")
+        value = self._clean_value(column, value)
+        index = self._get_index(column)
+        if index is not None:
+            return index.get(value)
+        if is_null(value):
+            return []
+        return [x for x, item in enumerate(self._iter_cleaned(column)) if item == value]
+
+    def _range_positions(self, column, low, high, low_inclusive, high_inclusive):
+        index = self._get_index(column)
+        if isinstance(index, SortedIndex):
+            # the rows of the result keep their order in the table
+            return sorted(index.range(low, high, low_inclusive, high_inclusive))
+        positions = []
+        for x, value in enumerate(self._iter_cleaned(column)):
+            if is_null(value):
+                continue
+            if low is not None and (value < low if low_inclusive else value <= low):
+                continue
+            if high is not None and (value > high if high_inclusive else value >= high):
+                continue
+            positions.append(x)
+        return positions
+
+    def between(self, column, low, high):
+        """Returns a table of the rows where 'column' is between 'low' and
+        'high', both included"""
+        if not self._has_column(column):
+            raise AttributeError(f"{self} does not have column {column}")
+        low = self._clean_value(column, low)
+        high = self._clean_value(column, high)
+        return self._take(self._range_positions(column, low, high, True, True))
+
+    def min(self, column):
+        if not self._has_column(column):
+            raise AttributeError(f"{self} does not have column {column}")
+        index = self._get_index(column)
+        if isinstance(index, SortedIndex):
+            return index.min()
+        return min(
+            (value for value in self._iter_cleaned(column) if not is_null(value)),
+            default=None,
+        )
+
+    def max(self, column):
+        if not self._has_column(column):
+            raise AttributeError(f"{self} does not have column {column}")
+        index = self._get_index(column)
+        if isinstance(index, SortedIndex):
+            return index.max()
+        return max(
+            (value for value in self._iter_cleaned(column) if not is_null(value)),
+            default=None,
+        )
+
     def set_type(self, column, type_):
         self.column_types[column] = type_
+        self._unverified.discard(column)
         self._standardize_types()
+        self._invalidate_indexes(column)
+        if self._settings.typed_columns:
+            self._type_columns(column)
+
+    def _type_columns(self, *headers):
+        """Moves the columns whose type has a compact representation into a
+        TypedColumn and turns typed columns whose type changed back into lists.
+        Columns holding values that can't be converted are left as they are."""
+        for header in headers or self.headers:
+            column = self._table_data.get(header)
+            if column is None:
+                continue
+            column_type = self.column_types.get(header)
+            if isinstance(column, TypedColumn):
+                if column.column_type == column_type:
+                    continue
+                column = list(column)
+                self._table_data[header] = column
+            if column_type in TYPECODES:
+                try:
+                    self._table_data[header] = TypedColumn(
+                        column_type,
+                        column,
+                        compile_converter(column_type, self._settings),
+                    )
+                except (ValueError, TypeError, ArithmeticError):
+                    pass
 
     def format_cells(self, cell_formatter, replace=True):
         arg_len = len(inspect.signature(cell_formatter).parameters)
@@ -194,6 +388,7 @@ class BaseTable(metaclass=ABCMeta):
                     self._table_data[key] = cell_formatter(
                         self._table_data[key], None, key
                     )
+        self._invalidate_indexes()
         if replace:
             self._settings.cell_formatter = cell_formatter
 
@@ -222,6 +417,7 @@ class BaseTable(metaclass=ABCMeta):
                     self._table_data[column] = formatter(
                         self._table_data[column], None, column
                     )
+        self._invalidate_indexes(column)
         return self
 
     def format_headers(self, formatter):
@@ -232,6 +428,13 @@ class BaseTable(metaclass=ABCMeta):
             self.column_types[formatter(self.headers[x])] = self.column_types.pop(
                 self.headers[x]
             )
+            if self.headers[x] in self._indexes:
+                index = self._indexes.pop(self.headers[x])
+                index.column = formatter(self.headers[x])
+                self._indexes[index.column] = index
+            if self.headers[x] in self._unverified:
+                self._unverified.discard(self.headers[x])
+                self._unverified.add(formatter(self.headers[x]))
             self.headers[x] = formatter(self.headers[x])
 
     def _standardize_types(self):
@@ -272,65 +475,65 @@ class BaseTable(metaclass=ABCMeta):
                 self.column_types[key] = "money"
             elif "boo" in datatype:
                 self.column_types[key] = "bool"
+        self._compile_converters()
+
+    def _compile_converters(self):
+        self._converters = {
+            header: compile_converter(column_type, self._settings)
+            for header, column_type in self.column_types.items()
+        }
+        self._converter_types = self.column_types.copy()
+
+    def _get_converters(self):
+        """Returns the compiled converter of every column, compiling them again
+        if the column types were changed since the last time"""
+        if self._converter_types != self.column_types:
+            self._compile_converters()
+        return self._converters
 
     def guess_types_from_data(self, guess_function=None):
+        """Guesses the type of every column without one from a sample of its
+        values, see infer.infer_type"""
         if guess_function:
             self.column_types = guess_function(self)
-        else:
-            if not self._settings.do_not_guess_types:
-                for cell in self[0]:
-                    if self.column_types[cell.header] is None:
-                        val = str(cell.value)
-                        if ("/" in val or "-" in val) and ":" in val:
-                            self.column_types[cell.header] = "timestamp"
-                        elif (
-                            ("/" in val or "-" in val)
-                            and not re.search("[a-zA-Z]", val)
-                            and (len(val) == 10 or len(val) == 8)
-                            and val[0] != "-"
-                        ):
-                            self.column_types[cell.header] = "date"
-                        elif ":" in val:
-                            self.column_types[cell.header] = "time"
-                        elif "$" in val:
-                            self.column_types[cell.header] = "money"
-                        elif "%" in val:
-                            self.column_types[cell.header] = "percent"
-                        elif (
-                            "." in val
-                            and val.replace(".", "").replace("-", "").isdecimal()
-                            and val.count(".") == 1
-                        ):
-                            self.column_types[cell.header] = "numeric"
-                        elif val.replace("-", "").isnumeric() and (
-                            val.count("-") == 0
-                            or (val.count("-") == 1 and val[1] == "-")
-                        ):
-                            type_string = "integer"
-                            col = self[cell.header]
-                            for col_cell in col:
-                                if col_cell.value is not None:
-                                    col_cell_val = str(col_cell.value)
-                                    if (
-                                        "." in col_cell_val
-                                        and col_cell_val.replace(".", "")
-                                        .replace("-", "")
-                                        .isdecimal()
-                                        and col_cell_val.count(".") == 1
-                                    ):
-                                        type_string = "numeric"
-                                        break
-                                    elif (
-                                        int(col_cell_val.replace(",", "")) < -2147483648
-                                        or int(col_cell_val.replace(",", ""))
-                                        > 2147483647
-                                    ):
-                                        type_string = "bigint"
-                                        break
-                            self.column_types[cell.header] = type_string
-                        else:
-                            self.column_types[cell.header] = "varchar"
-                            pass
+        elif not self._settings.do_not_guess_types and self.num_rows:
+            for header in self.headers:
+                if self.column_types.get(header) is None:
+                    column_type = infer.infer_type(self._table_data[header])
+                    self.column_types[header] = column_type or "varchar"
+                    if column_type not in (None, "varchar"):
+                        self._unverified.add(header)
+
+    def _verify_type(self, header):
+        """Converts every value of a column typed from a sample of its values
+        and widens the type past the values that don't convert, so a stray
+        value the sample missed can't break the column"""
+        self._unverified.discard(header)
+        column = self._table_data.get(header)
+        if column is None or isinstance(column, TypedColumn):
+            return
+        column_type = original = self.column_types.get(header)
+        converter = self._get_converters()[header]
+        for value in column:
+            try:
+                converter(value)
+            except (TypeError, ValueError, InvalidOperation):
+                wider = infer.promote(column_type, infer.classify(value))
+                if wider == column_type:
+                    continue
+                column_type = wider
+                if column_type == "varchar":
+                    break
+                converter = compile_converter(column_type, self._settings)
+        if column_type != original:
+            self.column_types[header] = column_type
+            self._invalidate_indexes(header)
+            if self._settings.typed_columns:
+                self._type_columns(header)
+
+    def _verify_types(self):
+        for header in list(self._unverified):
+            self._verify_type(header)
 
     def rename_column(self, old_column, new_column):
         if self._has_column(old_column):
@@ -338,6 +541,13 @@ class BaseTable(metaclass=ABCMeta):
             self.headers[self.headers.index(old_column)] = new_column
             if old_column in self.column_types:
                 self.column_types[new_column] = self.column_types.pop(old_column)
+            if old_column in self._unverified:
+                self._unverified.discard(old_column)
+                self._unverified.add(new_column)
+            if old_column in self._indexes:
+                index = self._indexes.pop(old_column)
+                index.column = new_column
+                self._indexes[new_column] = index
         return self
 
     def delete(self, *args):
@@ -349,30 +559,47 @@ class BaseTable(metaclass=ABCMeta):
                     del self._table_data[item]
                 if item in self.column_types:
                     del self.column_types[item]
+                self._indexes.pop(item, None)
             elif isinstance(item, int):
                 ints.append(item)
         ints.sort()
         for item in reversed(ints):
             if item < self.num_rows:
-                for key in self._table_data:
-                    del self._table_data[key][item]
-                self.num_rows -= 1
+                self._remove_row(item)
         return self
 
     def delete_by_column(self, column, *args):
         for item in args:
-            idx = self[column].index(item)
-            for key in self._table_data:
-                del self._table_data[key][idx]
-            self.num_rows -= 1
+            positions = self.lookup(column, item)
+            if not positions:
+                raise ValueError(f"{item} is not in column {column}")
+            self._remove_row(positions[0])
         return self
 
+    def _remove_row(self, position):
+        """Removes the row at 'position' and returns it as a dict"""
+        for header in self._indexes:
+            index = self._get_index(header)
+            key = self._clean_value(header, self._table_data[header][position])
+            index.remove_row(key, position)
+        row = {
+            header: self._table_data[header].pop(position) for header in self.headers
+        }
+        self.num_rows -= 1
+        return row
+
     def cell(self, x, y):
         if isinstance(y, str) and isinstance(x, int):
             if self._has_column(y):
                 if self._has_row(x):
                     return Cell(
-                        self._table_data[y][x], y, x, self.headers.index(y), self
+                        self._table_data[y][x],
+                        y,
+                        x,
+                        self.headers.index(y),
+                        self,
+                        self._settings,
+                        converter=self._get_converters().get(y),
                     )
                 else:
                     raise AttributeError(f"{self} does not have row {x}")
@@ -380,12 +607,21 @@ class BaseTable(metaclass=ABCMeta):
                 raise AttributeError(f"{self} does not have column {y}")
         elif isinstance(y, int) and isinstance(x, int):
             header = self.headers[y]
-            return Cell(self._table_data[header][x], header, x, y, self._get_row(x))
+            return Cell(
+                self._table_data[header][x],
+                header,
+                x,
+                y,
+                self._get_row(x),
+                self._settings,
+                converter=self._get_converters().get(header),
+            )
 
     def change_cell(self, x, y, value):
         if isinstance(y, str) and isinstance(x, int):
             if self._has_column(y):
                 if self._has_row(x):
+                    self._reindex_cell(y, x, value)
                     self._table_data[y][x] = value
                 else:
                     raise AttributeError(f"{self} does not have row {x}")
@@ -394,10 +630,23 @@ class BaseTable(metaclass=ABCMeta):
         elif isinstance(y, int) and isinstance(x, int):
             header = self.headers[y]
             if self._has_row(x):
+                self._reindex_cell(header, x, value)
                 self._table_data[header][x] = value
             else:
                 raise AttributeError(f"{self} does not have row {x}")
 
+    def _reindex_cell(self, header, position, value):
+        index = self._get_index(header)
+        if index is None:
+            return
+        old_key = self._clean_value(header, self._table_data[header][position])
+        new_key = self._clean_value(header, value)
+        if old_key == new_key:
+            return
+        index.check(new_key)
+        index.discard(old_key, position)
+        index.add(new_key, position)
+
     def count_val(self, value, column=None):
         val_count = 0
         if self:
@@ -465,30 +714,26 @@ class BaseTable(metaclass=ABCMeta):
         the table and returned from the function"""
         if isinstance(where, int):
             if self._has_row(where):
-                row = self[where]
-                r = {
-                    cell.header: self._table_data[cell.header].pop(where)
-                    for cell in row
-                }
-                self.num_rows -= 1
-                return r
+                return self._remove_row(where)
         else:
-            indecies = []
-            for key, value in where.items():
-                indecies.append({i for i, x in enumerate(self[key]) if x == value})
-            row = set.intersection(*indecies)
-            r = {
-                cell.header: self._table_data[cell.header].pop()
-                for cell in self[list(row)[0]]
-            }
-            self.num_rows -= 1
-            return r
+            where = list(where.items())
+            # look the rows up through an index when one of the columns has one
+            where.sort(key=lambda item: item[0] not in self._indexes)
+            column, value = where[0]
+            others = [(key, self._clean_value(key, other)) for key, other in where[1:]]
+            for position in self.lookup(column, value):
+                if all(
+                    self._clean_value(key, self._table_data[key][position]) == expected
+                    for key, expected in others
+                ):
+                    return self._remove_row(position)
 
     def pop_column(self, col_name):
         if isinstance(col_name, str):
             if self._has_column(col_name):
                 c = self._table_data.pop(col_name)
                 self.headers.remove(col_name)
+                self._indexes.pop(col_name, None)
                 self.num_cols -= 1
                 return c
         elif isinstance(col_name, int):
@@ -496,37 +741,77 @@ class BaseTable(metaclass=ABCMeta):
                 pass
 
     def filter(self, column, condition, what):
-        if condition == "==":
-            condition = lambda x, y: x == y
-        elif condition == "<=":
-            condition = lambda x, y: x <= y
-        elif condition == ">=":
-            condition = lambda x, y: x >= y
-        elif condition == ">":
-            condition = lambda x, y: x > y
-        elif condition == "<":
-            condition = lambda x, y: x < y
-        elif condition == "!=":
-            condition = lambda x, y: x != y
-        else:
-            raise SyntaxError
-        filtered_table = Table(
-            self.headers, self.footers, self.column_types, self.name, self._settings
+        if condition == "==" and column in self._indexes:
+            return self._take(self.lookup(column, what))
+        if condition in RANGE_CONDITIONS and isinstance(
+            self._indexes.get(column), SortedIndex
+        ):
+            what = self._clean_value(column, what)
+            if what is not None:
+                low_inclusive, high_inclusive = RANGE_CONDITIONS[condition]
+                low = what if low_inclusive is not None else None
+                high = what if high_inclusive is not None else None
+                return self._take(
+                    self._range_positions(
+                        column, low, high, low_inclusive, high_inclusive
+                    )
+                )
+        return self.where(expr.ColumnRef(self, column).compare(condition, what))
+
+    @property
+    def c(self):
+        """Column references for building filter expressions, see where(). A
+        column named "c" is returned instead, as attribute access to columns
+        always did; use expr.Columns(table) to build expressions then."""
+        if self._has_column("c"):
+            return self._get_column("c")
+        return expr.Columns(self)
+
+    def where(self, mask):
+        """Returns a table of the rows selected by 'mask', which is built by
+        comparing columns and combining the results with &, | and ~
+
+            table.where((table.c.amount > 100) & table.c.region.isin({"EU", "US"}))
+        """
+        if len(mask) != self.num_rows:
+            raise ValueError("shape of mask does not match table")
+        return self._take(list(compress(range(self.num_rows), mask)))
+
+    def _take_columns(self, positions):
+        columns = {}
+        for header in self.headers:
+            column = self._table_data[header]
+            if isinstance(column, TypedColumn):
+                columns[header] = column.take(positions)
+            else:
+                columns[header] = [column[x] for x in positions]
+        return columns
+
+    def _take(self, positions):
+        return DictOfListsTable(
+            self._take_columns(positions),
+            list(self.headers),
+            list(self.footers),
+            self.column_types.copy(),
+            self.name,
+            self._settings,
         )
-        for row in self:
-            if condition(row[column], what):
-                filtered_table.add_row(row)
-        return filtered_table
 
     def columns(self):
         return [self._get_column(header) for header in self.headers]
 
     def field_definitions(self):
+        self._verify_types()
         output = []
         for header in self.headers:
             output.append({"name": header, "type": self.column_types[header]})
         return output
 
+    def to_sql(self, bind, table_name, if_exists="fail", batch_size=10000, schema=None):
+        """Writes the table to a database through a SQLAlchemy engine or
+        connection, see sql.to_sql"""
+        sql.to_sql(self, bind, table_name, if_exists, batch_size, schema)
+
     def replace(self, ident, old, new):
         if isinstance(ident, str):
             if self._has_column(ident):
@@ -539,6 +824,7 @@ class BaseTable(metaclass=ABCMeta):
         if self._has_column(col):
             for row in self:
                 self._table_data[col][row.row_num] = key(row[col]._value)
+            self._invalidate_indexes(col)
 
     def pprint(self, num_rows=None):
         col_lengths = [0 for _ in range(self.num_cols)]
@@ -570,23 +856,80 @@ class BaseTable(metaclass=ABCMeta):
                 break
         return table_string
 
+    def itertuples(self, *columns, cleaned=True, named=False, index=False):
+        """Iterates over the rows as plain tuples, zipped straight from the
+        column lists without building any Row or Cell objects. 'columns'
+        selects and orders the columns, 'cleaned' runs every value through the
+        column's converter and 'named' yields namedtuples instead. Headers
+        that aren't valid identifiers or repeat get positional names like _1.
+        'index' puts the row number first, named Index."""
+        columns = columns or tuple(self.headers)
+        for column in columns:
+            if not self._has_column(column):
+                raise AttributeError(f"{self} does not have column {column}")
+        if cleaned:
+            iterables = [self._iter_cleaned(column) for column in columns]
+        else:
+            iterables = [self._table_data[column] for column in columns]
+        if index:
+            iterables.insert(0, range(self.num_rows))
+            columns = ("Index",) + tuple(columns)
+        if named:
+            return map(namedtuple("Row", columns, rename=True)._make, zip(*iterables))
+        return zip(*iterables)
+
+    def iter_columns(self, *columns, cleaned=True):
+        """Iterates over (header, values) pairs, one per column. Without
+        cleaning the values are the table's own column lists, not copies."""
+        for column in columns or tuple(self.headers):
+            if cleaned:
+                yield column, list(self._iter_cleaned(column))
+            else:
+                yield column, self._table_data[column]
+
+    def _iter_cleaned(self, header, memoize=False, start=None, stop=None):
+        """Iterates over the cleaned values of a column, falling back to the
+        raw value when it can't be converted like Cell does. 'memoize' converts
+        every distinct raw value only once, which pays off for key columns.
+        'start' and 'stop' limit it to a slice of the rows."""
+        if header in self._unverified:
+            self._verify_type(header)
+        column = self._table_data[header]
+        if start is not None or stop is not None:
+            column = column[start:stop]
+        if isinstance(column, TypedColumn):
+            return iter(column)
+        converter = self._get_converters()[header]
+
+        def convert(value):
+            try:
+                return converter(value)
+            except (TypeError, ValueError, InvalidOperation):
+                return value
+
+        if memoize:
+            return map(MemoDict(convert).__getitem__, column)
+        return map(convert, column)
+
     def to_dicts(self, *columns):
         if columns:
             return ({col: row[col] for col in columns} for row in self)
         else:
-            return (row.to_dict() for row in self)
+            headers = list(self.headers)
+            return (dict(zip(headers, values)) for values in self.itertuples())
 
     def to_list_of_dicts(self, *columns):
         if columns:
             return [{col: row[col] for col in columns} for row in self]
         else:
-            return [row.to_dict() for row in self]
+            return list(self.to_dicts())
 
     def to_list_of_tuples(self, *columns):
         if columns:
             return [tuple(row[col] for col in columns) for row in self]
         else:
-            return [row.to_tuple() for row in self]
+            headers = list(self.headers)
+            return [tuple(zip(headers, values)) for values in self.itertuples()]
 
     def to_list_of_lists(self, *columns, include_header=False):
         output = []
@@ -595,16 +938,25 @@ class BaseTable(metaclass=ABCMeta):
                 output.append(columns)
             else:
                 output.append(self.headers)
-        for row in self:
-            if columns:
+        if columns:
+            for row in self:
                 output.append([row[col] for col in columns])
-            else:
-                output.append(row.to_list())
+        else:
+            output.extend(map(list, self.itertuples()))
         return output
 
     def to_dict(self, row_num):
         return self._get_row(row_num).to_dict()
 
+    def join(self, other, on, how="inner", suffixes=("_left", "_right")):
+        """Joins 'other' to this table on the 'on' columns, see join.join"""
+        return join.join(self, other, on, how, suffixes)
+
+    def group_by(self, *keys):
+        """Groups the rows on the values of the 'keys' columns. Call .agg() on
+        the result to compute aggregates for every group in one pass."""
+        return aggregate.GroupBy(self, keys)
+
     def pivot(
         self,
         rows=None,
@@ -613,118 +965,159 @@ class BaseTable(metaclass=ABCMeta):
         aggr_funcs=None,
         row_sort=None,
         col_sort=None,
+        margins=False,
+        margins_name="Total",
     ):
+        """Aggregates the 'values' columns for every distinct value of 'rows'
+        and/or 'columns' in a single pass over the data. 'aggr_funcs' is either
+        one aggregate function used for every value column or a list with one
+        function per value column, each called as func(old, new, n). With
+        several values and a 'columns' column the output headers are
+        "<column value> <value header>", and a value column listed more than
+        once gets a _2, _3... suffix. Blank keys are grouped with None and
+        blank values are skipped. 'margins' adds a total row and, when
+        pivoting on 'columns', total columns computed from the raw values."""
         if self:
             if not isinstance(values, list):
                 raise TypeError(
                     'The "values" parameter must be a list of value column headers'
                 )
-            r = []
-            distinct_row = []
-            row_indexes = {}
-            c = []
-            distinct_col = []
-            col_indexes = {}
-            column_types = {}
-
-            if rows:
-                r = self._table_data[rows]
-                distinct_row = list(set(r))
-            if columns:
-                c = self._table_data[columns]
-                distinct_col = list(set(c))
-            vs = []
-            for value in values:
-                vs.append(
-                    [
-                        clean_value(val, self.column_types[value], self._settings)
-                        for val in self._table_data[value]
-                    ]
-                )
-            if distinct_row:
-                if row_sort:
-                    distinct_row.sort(key=row_sort)
-                else:
-                    distinct_row.sort()
-                row_indexes = {val: getindexes(r, val) for val in distinct_row}
-            if distinct_col:
-                if col_sort:
-                    distinct_col.sort(key=col_sort)
+            if aggr_funcs is None:
+                aggr_funcs = [sum_aggr for _ in values]
+            elif callable(aggr_funcs):
+                aggr_funcs = [aggr_funcs for _ in values]
+            if len(aggr_funcs) != len(values):
+                raise ValueError("there must be one aggregate function per value")
+            num_values = len(values)
+            value_names = unique_headers(values)
+
+            def keys_of(column):
+                if not column:
+                    return repeat(None, self.num_rows)
+                keys = self._iter_cleaned(column, True)
+                return (None if key == "" else key for key in keys)
+
+            row_keys = keys_of(rows)
+            col_keys = keys_of(columns)
+            value_columns = [self._iter_cleaned(value) for value in values]
+
+            aggregators = list(enumerate(aggr_funcs))
+
+            def accumulate(groups, key, vals):
+                state = groups.get(key)
+                if state is None:
+                    state = groups[key] = ([0] * num_values, [0] * num_values)
+                accs, counts = state
+                for x, aggr_func in aggregators:
+                    val = vals[x]
+                    if not is_null(val):
+                        n = counts[x] = counts[x] + 1
+                        accs[x] = aggr_func(accs[x], val, n)
+
+            cells = {}
+            row_totals = {}
+            col_totals = {}
+            grand_total = {}
+            for key, vals in zip(zip(row_keys, col_keys), zip(*value_columns)):
+                accumulate(cells, key, vals)
+                if margins:
+                    accumulate(row_totals, key[0], vals)
+                    accumulate(col_totals, key[1], vals)
+                    accumulate(grand_total, None, vals)
+
+            def result(state):
+                if state is None:
+                    return [None] * num_values
+                accs, counts = state
+                return [acc if n else None for acc, n in zip(accs, counts)]
+
+            def sort_keys(keys, key):
+                keys = list(keys)
+                present = [k for k in keys if k is not None]
+                present.sort(key=key)
+                if len(present) < len(keys):
+                    present.append(None)
+                return present
+
+            distinct_row = sort_keys({key[0] for key in cells}, row_sort)
+            distinct_col = sort_keys({key[1] for key in cells}, col_sort)
+            value_types = []
+            for value, aggr_func in zip(values, aggr_funcs):
+                if aggr_func is count_aggr:
+                    value_types.append("integer")
+                elif aggr_func is avg_aggr:
+                    value_types.append("numeric")
                 else:
-                    distinct_col.sort()
-                col_indexes = {val: getindexes(c, val) for val in distinct_col}
-
-            list_of_lists = []
+                    value_types.append(self.column_types[value])
 
-            if row_indexes and col_indexes:
-                for y, row_val in enumerate(distinct_row):
-                    list_of_lists.append([row_val])
-                    for x, col_val in enumerate(distinct_col):
-                        intersection = set(row_indexes[row_val]).intersection(
-                            col_indexes[col_val]
-                        )
-                        if intersection:
-                            list_of_lists[y].append(0)
-                            for n, i in enumerate(intersection):
-                                # must fix to go through all the values and aggregate
-                                # functions insead of just the first ones
-                                list_of_lists[y][x + 1] = aggr_funcs(
-                                    list_of_lists[y][x + 1], vs[0][i], n + 1
-                                )
-                        else:
-                            list_of_lists[y].append(None)
-                column_types = {col: self.column_types[values] for col in distinct_col}
-                column_types[rows] = self.column_types[rows]
-                distinct_col.insert(0, rows)
-
-            elif row_indexes:
-                for y, (row_val, n) in enumerate(row_indexes.items()):
-                    list_of_lists.append([row_val])
-                    for x, v in enumerate(vs):
-                        list_of_lists[y].append(0)
-                        for i, row in enumerate(n):
-                            list_of_lists[y][x + 1] = aggr_funcs[x](
-                                list_of_lists[y][x + 1], v[row], i + 1
-                            )
-                distinct_col = [rows, *values]
-                column_types = {value: self.column_types[value] for value in values}
+            headers = []
+            column_types = {}
+            output = {}
+            if rows:
+                headers.append(rows)
                 column_types[rows] = self.column_types[rows]
-
-            # Haven't tried this one yet, probably doesn't work as expected!
-            elif col_indexes:
-                for y, (col_val, n) in enumerate(col_indexes.items()):
-                    list_of_lists.append([col_val])
-                    for x, v in enumerate(vs):
-                        list_of_lists[y].append(0)
-                        for i, row in enumerate(n):
-                            list_of_lists[y][x + 1] = aggr_funcs[x](
-                                list_of_lists[y][x + 1], v[row], i + 1
-                            )
-                distinct_col = [columns, values]
-                column_types = {
-                    columns: self.column_types[columns],
-                    values: self.column_types[values],
-                }
-                # Should have to transpose the headers (distinct_col)
-                # and column_types as well
-                transpose(list_of_lists)
-
-            return ListOfListsTable(
-                list_of_lists,
-                distinct_col,
+                output[rows] = list(distinct_row)
+                if margins:
+                    output[rows].append(margins_name)
+            if columns:
+                col_groups = []
+                for col_key in distinct_col:
+                    states = [cells.get((row_key, col_key)) for row_key in distinct_row]
+                    if margins and rows:
+                        states.append(col_totals.get(col_key))
+                    col_groups.append((col_key, states))
+                if margins:
+                    states = [row_totals.get(row_key) for row_key in distinct_row]
+                    if rows:
+                        states.append(grand_total.get(None))
+                    col_groups.append((margins_name, states))
+                for label, states in col_groups:
+                    results = [result(state) for state in states]
+                    for x, (value, value_type) in enumerate(
+                        zip(value_names, value_types)
+                    ):
+                        header = str(label) if num_values == 1 else f"{label} {value}"
+                        headers.append(header)
+                        column_types[header] = value_type
+                        output[header] = [res[x] for res in results]
+            else:
+                states = [cells.get((row_key, None)) for row_key in distinct_row]
+                if margins:
+                    states.append(grand_total.get(None))
+                results = [result(state) for state in states]
+                for x, (value, value_type) in enumerate(zip(value_names, value_types)):
+                    headers.append(value)
+                    column_types[value] = value_type
+                    output[value] = [res[x] for res in results]
+
+            return DictOfListsTable(
+                output,
+                headers,
                 self.footers,
                 column_types,
                 self.name,
                 self._settings,
             )
 
-    def to_excel(self, formatter=None):
+    def to_excel(self, formatter=None, write_only=False, max_rows=EXCEL_MAX_ROWS):
+        """Returns an openpyxl Workbook holding the table. 'formatter' is
+        called once per column with the column type and header and returns
+        the number format of the column. The rows continue on a new sheet
+        once a sheet holds 'max_rows' rows.
+
+        'write_only' builds the workbook with write-only worksheets instead,
+        which stream the rows out as they are added and style the cells with
+        one named style per column. That keeps memory flat for large tables
+        but the workbook can only be saved once."""
         try:
             # noinspection PyUnresolvedReferences
             import openpyxl
 
             # noinspection PyUnresolvedReferences
-            from openpyxl.styles import Font, Alignment
+            from openpyxl.cell import WriteOnlyCell
+
+            # noinspection PyUnresolvedReferences
+            from openpyxl.styles import Alignment, Font, NamedStyle
         except ImportError:
             print(
                 "openpyxl is required in order to create an Excel file. Alternativly",
@@ -732,128 +1125,265 @@ class BaseTable(metaclass=ABCMeta):
                 "Excel.",
             )
             raise
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        for y, cell in enumerate(self.headers, start=1):
-            ws.cell(column=y, row=1).value = cell
-            ws.cell(column=y, row=1).font = Font(bold=True)
-            ws.cell(column=y, row=1).alignment = Alignment(
-                wrap_text=True, horizontal="center", vertical="center"
+        self._verify_types()
+        headers = list(self.headers)
+        # None leaves the format to openpyxl, which picks one for dates
+        number_formats = [
+            formatter(self.column_types[header], header) if formatter else None
+            for header in headers
+        ]
+        rows_per_sheet = max_rows - (2 if self.footers else 1)
+        header_font = Font(bold=True)
+        header_alignment = Alignment(
+            wrap_text=True, horizontal="center", vertical="center"
+        )
+        right_alignment = Alignment(horizontal="right")
+        wb = openpyxl.Workbook(write_only=write_only)
+
+        if write_only:
+
+            def styled_cell(ws, value, style):
+                cell = WriteOnlyCell(ws, value)
+                cell.style = style
+                return cell
+
+            header_style = NamedStyle(
+                "veritas header", font=header_font, alignment=header_alignment
             )
-        ws.row_dimensions[1].height = 30
-        try:
-            for y, row in enumerate(self, start=2):
-                for x, cell in enumerate(row, start=1):
-                    header = self.headers[x - 1]
-                    if formatter:
-                        form = formatter(self.column_types[header], header)
-                        if form:
-                            ws.cell(column=x, row=y).number_format = form
-                    ws.cell(column=x, row=y).value = cell.value
-                    ws.cell(column=x, row=y).alignment = Alignment(horizontal="right")
-        except IndexError:
-            pass
-        lastrow = len(self) + 2
+            wb.add_named_style(header_style)
+            column_styles = []
+            footer_styles = []
+            for x, number_format in enumerate(number_formats):
+                column_style = NamedStyle(
+                    f"veritas column {x}",
+                    number_format=number_format or "General",
+                    alignment=right_alignment,
+                )
+                footer_style = NamedStyle(
+                    f"veritas footer {x}",
+                    number_format=number_format or "General",
+                    font=header_font,
+                    alignment=right_alignment,
+                )
+                wb.add_named_style(column_style)
+                wb.add_named_style(footer_style)
+                column_styles.append(column_style.name)
+                footer_styles.append(footer_style.name)
+
+            def new_sheet():
+                ws = wb.create_sheet()
+                ws.row_dimensions[1].height = 30
+                ws.append(
+                    [styled_cell(ws, header, header_style.name) for header in headers]
+                )
+                return ws
+
+            ws = None
+            for y, values in enumerate(self.itertuples()):
+                if y % rows_per_sheet == 0:
+                    ws = new_sheet()
+                    # write-only sheets serialize each row as it is appended, so
+                    # one styled cell per column is reused for all the rows
+                    cells = [styled_cell(ws, None, style) for style in column_styles]
+                for cell, value in zip(cells, values):
+                    cell.value = value
+                ws.append(cells)
+            if ws is None:
+                ws = new_sheet()
+            if self.footers:
+                ws.append(
+                    [
+                        styled_cell(ws, footer, getitem(footer_styles, x, "Normal"))
+                        for x, footer in enumerate(self.footers)
+                    ]
+                )
+            return wb
+
+        def new_sheet():
+            ws = wb.create_sheet() if sheets else wb.active
+            sheets.append(ws)
+            for y, header in enumerate(headers, start=1):
+                cell = ws.cell(column=y, row=1, value=header)
+                cell.font = header_font
+                cell.alignment = header_alignment
+            ws.row_dimensions[1].height = 30
+            return ws
+
+        sheets = []
+        ws = None
+        row = 1
+        for y, values in enumerate(self.itertuples()):
+            if y % rows_per_sheet == 0:
+                ws = new_sheet()
+                row = 1
+            row += 1
+            for x, value in enumerate(values, start=1):
+                cell = ws.cell(column=x, row=row, value=value)
+                if number_formats[x - 1]:
+                    cell.number_format = number_formats[x - 1]
+                cell.alignment = right_alignment
+        if ws is None:
+            ws = new_sheet()
         if self.footers:
-            for y, cell in enumerate(self.footers, start=1):
-                ws.cell(column=y, row=lastrow).value = cell
-                ws.cell(column=y, row=lastrow).number_format = ws.cell(
-                    column=y, row=lastrow - 1
-                ).number_format
-                ws.cell(column=y, row=lastrow).font = Font(bold=True)
-                ws.cell(column=y, row=lastrow).alignment = Alignment(horizontal="right")
+            row += 1
+            for x, footer in enumerate(self.footers, start=1):
+                cell = ws.cell(column=x, row=row, value=footer)
+                number_format = getitem(number_formats, x - 1)
+                if number_format:
+                    cell.number_format = number_format
+                cell.font = header_font
+                cell.alignment = right_alignment
         return wb
 
-    def to_csv(self, header=True, footer=False, handle_none=False):
-        csv_pieces = []
+    def to_csv(
+        self,
+        header=True,
+        footer=False,
+        handle_none=False,
+        path_or_file=None,
+        chunk_rows=10000,
+        dialect="excel",
+        raw=False,
+        encoding="utf-8",
+        **fmtparams,
+    ):
+        """Writes the table as csv to 'path_or_file', which is a path or a file
+        like object, or returns the csv as a string when it is None. Rows are
+        formatted and written 'chunk_rows' at a time so memory use doesn't grow
+        with the table. 'raw' writes the stored values instead of formatting
+        them. Extra keyword arguments are csv.writer format parameters."""
+        fmtparams.setdefault("lineterminator", "\n")
+        args = (header, footer, handle_none, chunk_rows, dialect, raw, fmtparams)
+        if path_or_file is None:
+            output = StringIO()
+            self._write_csv(output, *args)
+            return output.getvalue()
+        if isinstance(path_or_file, (str, PathLike)):
+            with open(path_or_file, "w", newline="", encoding=encoding) as output:
+                self._write_csv(output, *args)
+        else:
+            self._write_csv(path_or_file, *args)
+
+    def _write_csv(
+        self, output, header, footer, handle_none, chunk_rows, dialect, raw, fmtparams
+    ):
+        rows = zip(
+            *[self._iter_formatted(column, raw, handle_none) for column in self.headers]
+        )
+        chunks = chunked(rows, chunk_rows)
+        csv_writer = writer(output, dialect, **fmtparams)
         if self.headers and header:
-            for head in self.headers:
-                head = str(head)
-                if "," in head:
-                    csv_pieces.append(f'"{head}",')
-                else:
-                    csv_pieces.append(f"{head},")
-            csv_pieces = "".join(csv_pieces)
-            csv_pieces = [f"{csv_pieces[:-1]}\n"]
-        for row in self:
-            for cell in row:
-                if handle_none and cell.value is None:
-                    cell = ""
-                cell = str(cell)
-                if "," in cell:
-                    csv_pieces.append(f'"{cell}",')
-                else:
-                    csv_pieces.append(f"{cell},")
-            csv_pieces = "".join(csv_pieces)
-            csv_pieces = [f"{csv_pieces[:-1]}\n"]
+            csv_writer.writerow(self.headers)
+        for chunk in chunks:
+            csv_writer.writerows(chunk)
         if self.footers and footer:
-            for footer in self.footers:
-                footer = str(footer)
-                if "," in footer:
-                    csv_pieces.append(f'"{footer}",')
-                else:
-                    csv_pieces.append(f"{footer},")
-            csv_pieces = "".join(csv_pieces)
-            csv_pieces = [f"{csv_pieces[:-1]}\n"]
-        return "".join(csv_pieces)
+            csv_writer.writerow(self.footers)
+
+    def _iter_formatted(self, header, raw=False, handle_none=False):
+        """Iterates over the values of a column as they are displayed by Cell,
+        or as they are stored when 'raw' is set"""
+        if raw:
+            return iter(self._table_data[header])
+        # cleaning first settles the type the formatter is compiled for
+        values = self._iter_cleaned(header)
+        formatter = self._get_formatter(header)
+        if handle_none:
+            return ("" if value is None else formatter(value) for value in values)
+        return map(formatter, values)
+
+    def _get_formatter(self, header):
+        if header in self._settings.dont_format:
+            return str
+        return compile_formatter(
+            self.column_types.get(header),
+            self._settings.datetime_format,
+            self._settings.format_options,
+        )
+
+    def to_json(
+        self, path_or_file=None, orient="records", chunk_rows=10000, encoding="utf-8"
+    ):
+        """Writes the table as JSON to 'path_or_file', which is a path or a
+        file like object, or returns it as a string when it is None. See
+        iter_json for the orients."""
+        chunks = self.iter_json(orient, chunk_rows)
+        if path_or_file is None:
+            return "".join(chunks)
+        if isinstance(path_or_file, (str, PathLike)):
+            with open(path_or_file, "w", encoding=encoding) as output:
+                output.writelines(chunks)
+        else:
+            path_or_file.writelines(chunks)
+
+    def iter_json(self, orient="records", chunk_rows=10000):
+        """Generates the table as JSON a piece at a time, encoding 'chunk_rows'
+        rows per piece, so it can be streamed out as it is produced. 'orient'
+        is one of:
+
+            records: [{"a": 1, "b": 2}, ...]
+            arrays: [["a", "b"], [1, 2], ...] with the headers first
+            columns: {"a": [1, ...], "b": [2, ...]}
+            ndjson: one record per line
+
+        Values are the cleaned values, decimals are written as numbers with
+        all their digits, dates and times as ISO 8601 strings, intervals as a
+        number of seconds and blanks outside of varchar columns as null."""
+        if orient not in JSON_ORIENTS:
+            raise ValueError(f"orient must be one of {', '.join(JSON_ORIENTS)}")
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be at least 1, not {chunk_rows}")
+        return self._iter_json(orient, chunk_rows)
+
+    def _iter_json(self, orient, chunk_rows):
+        encode = JSONEncoder(default=json_default, separators=(",", ":")).encode
+        headers = list(self.headers)
+        keys = [f"{encode(str(header))}:" for header in headers]
+        if orient == "columns":
+            yield "{"
+            for x, key in enumerate(keys):
+                yield f"{',' if x else ''}{key}["
+                separator = ""
+                tokens = json_tokens(self._iter_typed(headers[x]), encode)
+                for chunk in chunked(tokens, chunk_rows):
+                    yield separator + ",".join(chunk)
+                    separator = ","
+                yield "]"
+            yield "}"
+            return
+        rows = zip(
+            *[json_tokens(self._iter_typed(header), encode) for header in headers]
+        )
+        if orient == "arrays":
+            rows = (f"[{','.join(row)}]" for row in rows)
+        else:
+            rows = (f"{{{','.join(map(str.__add__, keys, row))}}}" for row in rows)
+        if orient == "ndjson":
+            for chunk in chunked(rows, chunk_rows):
+                yield "".join([f"{row}\n" for row in chunk])
+            return
+        yield "["
+        separator = ""
+        if orient == "arrays":
+            yield encode(headers)
+            separator = ","
+        for chunk in chunked(rows, chunk_rows):
+            yield separator + ",".join(chunk)
+            separator = ","
+        yield "]"
+
+    def _iter_typed(self, header):
+        """Iterates over the cleaned values of a column with the blanks of a
+        column that isn't varchar as None, for writing to typed formats"""
+        values = self._iter_cleaned(header)
+        if self.column_types.get(header) == "varchar":
+            return values
+        # a blank left by a converter is a missing value, not a string
+        return (None if value == "" else value for value in values)
 
     def to_json_string(self, json_type="array_of_objects"):
-        json_pieces = []
-        if json_type == "array_of_objects":
-            if self.headers:
-                json_pieces.append("[")
-                for row in self:
-                    json_pieces.append("{")
-                    if self.column_types:
-                        for header in self.headers:
-                            cell = row[header]
-                            if (
-                                "int" in str(cell.column_type).lower()
-                                or "float" in str(cell.column_type).lower()
-                                or "decimal" in str(cell.column_type).lower()
-                            ):
-                                json_pieces.append(
-                                    f'"{str(header)}":{str(cell).replace(",", "")}, '
-                                )
-                            else:
-                                json_pieces.append(f'"{str(header)}":"{str(cell)}", ')
-                    else:
-                        for header in self.headers:
-                            json_pieces.append(
-                                f'"{str(header)}":"{str(row[header])}", '
-                            )
-                    json_pieces = "".join(json_pieces)
-                    json_pieces = [f"{json_pieces[:-2]}}}, "]
-                json_pieces = "".join(json_pieces)
-                json_pieces = [f"{json_pieces[:-2]}]"]
-        elif json_type == "array_of_arrays":
-            json_pieces.append("[")
-            if self.headers:
-                json_pieces.append("[")
-                for header in self.headers:
-                    json_pieces.append(f'"{str(header)}", ')
-                json_pieces = "".join(json_pieces)
-                json_pieces = [f"{json_pieces[:-2]}], "]
-            for row in self:
-                json_pieces.append("[")
-                if self.column_types:
-                    for cell in row:
-                        if (
-                            "int" in str(cell.column_type).lower()
-                            or "float" in str(cell.column_type).lower()
-                            or "decimal" in str(cell.column_type).lower()
-                        ):
-                            json_pieces.append('{str(cell).replace(",", "")}, ')
-                        else:
-                            json_pieces.append(f'"{str(cell)}", ')
-                else:
-                    for cell in row:
-                        json_pieces.append(f'"{str(cell)}", ')
-                json_pieces = "".join(json_pieces)
-                json_pieces = [f"{json_pieces[:-2]}}}, "]
-            json_pieces = "".join(json_pieces)
-            json_pieces = [f"{json_pieces[:-2]}]"]
-        return "".join(json_pieces)
+        if json_type == "array_of_arrays":
+            return self.to_json(orient="arrays")
+        return self.to_json(orient="records")
 
     def to_html_table(
         self,
@@ -866,7 +1396,60 @@ class BaseTable(metaclass=ABCMeta):
         row_totals=False,
         col_totals=False,
         col_group=False,
+        page=None,
+        page_size=None,
     ):
+        """Renders the table as HTML. With a 'page_size' only the rows of that
+        'page', counting from 1, are rendered. See iter_html to stream it."""
+        return "".join(
+            self.iter_html(
+                inner_table=inner_table,
+                footer=footer,
+                full_html=full_html,
+                add_attr=add_attr,
+                table_attr=table_attr,
+                header_formatter=header_formatter,
+                row_totals=row_totals,
+                col_totals=col_totals,
+                col_group=col_group,
+                page=page,
+                page_size=page_size,
+            )
+        )
+
+    def iter_html(
+        self,
+        chunk_rows=1000,
+        inner_table=False,
+        footer=False,
+        full_html=False,
+        add_attr=None,
+        table_attr=None,
+        header_formatter=None,
+        row_totals=False,
+        col_totals=False,
+        col_group=False,
+        page=None,
+        page_size=None,
+    ):
+        """Generates the HTML of to_html_table a piece at a time, rendering
+        'chunk_rows' rows per piece so a large table can be streamed out with
+        bounded memory. Each column's formatter is compiled once up front.
+
+        With a 'page_size' only the rows of 'page' are rendered, and
+        'col_totals' and 'row_totals' then add up the rows of that page only,
+        not the whole table."""
+        start = 0
+        stop = self.num_rows
+        if page_size is not None:
+            if page is None:
+                page = 1
+            if page < 1 or page_size < 1:
+                raise ValueError("page and page_size start at 1")
+            start = min((page - 1) * page_size, self.num_rows)
+            stop = min(start + page_size, self.num_rows)
+        elif page is not None:
+            raise ValueError("page requires a page_size")
         html_pieces = []
         if full_html:
             html_pieces.append("<html><body>")
@@ -893,19 +1476,57 @@ class BaseTable(metaclass=ABCMeta):
         elif footer:
             html_pieces.append("<tfoot></tfoot>")
         html_pieces.append("<tbody>")
-        grand_total = 0
-        for y, row in enumerate(self):
-            html_pieces.append(f"<tr>{row.to_html(add_attr, row_totals)}</tr>")
+        yield "".join(html_pieces)
+        self._verify_types()
+        headers = list(self.headers)
+        types = self.column_types
+        formatters = [self._get_formatter(header) for header in headers]
+        column_totals = [Decimal(0) for _ in headers]
+        for chunk_start in range(start, stop, chunk_rows):
+            chunk_stop = min(chunk_start + chunk_rows, stop)
+            values = [
+                list(self._iter_cleaned(header, start=chunk_start, stop=chunk_stop))
+                for header in headers
+            ]
+            texts = [
+                list(map(formatter, column))
+                for formatter, column in zip(formatters, values)
+            ]
+            if add_attr:
+                raw_values = [
+                    self._table_data[header][chunk_start:chunk_stop]
+                    for header in headers
+                ]
+                rows = []
+                for y, raw_row, text_row in zip(
+                    range(chunk_start, chunk_stop), zip(*raw_values), zip(*texts)
+                ):
+                    row = self._get_row(y)
+                    rows.append(
+                        "".join(
+                            f"<td {add_attr(raw, types[header], header, row)}>"
+                            f"{text}</td>"
+                            for raw, header, text in zip(raw_row, headers, text_row)
+                        )
+                    )
+            else:
+                rows = [f"<td>{'</td><td>'.join(row)}</td>" for row in zip(*texts)]
             if row_totals:
-                grand_total += row.sum()
+                rows = [
+                    f'{row}<td class="rowtotal">{decimal_sum(row_values):,}</td>'
+                    for row, row_values in zip(rows, zip(*values))
+                ]
+            if col_totals:
+                for x, column in enumerate(values):
+                    column_totals[x] += decimal_sum(column)
+            yield "".join([f"<tr>{row}</tr>" for row in rows])
+        html_pieces = []
         if col_totals:
-            grand_total = 0
             html_pieces.append("<tr>")
-            for col in self.columns():
-                total = col.sum()
+            for total in column_totals:
                 html_pieces.append(f'<td class="coltotal">{total:,}</td>')
-                grand_total += total
             if row_totals:
+                grand_total = sum(column_totals)
                 html_pieces.append(f'<td class="grandtotal">{grand_total:,}</td>')
             html_pieces.append("</tr>")
         html_pieces.append("</tbody>")
@@ -913,7 +1534,7 @@ class BaseTable(metaclass=ABCMeta):
             html_pieces.append("</table>")
         if full_html:
             html_pieces.append("</body></html>")
-        return "".join(html_pieces)
+        yield "".join(html_pieces)
 
     def headers_to_html(self, header_formatter=None, add_attr=None):
         if header_formatter:
@@ -941,19 +1562,51 @@ class BaseTable(metaclass=ABCMeta):
     def footers_to_html(self):
         return "".join([f"<th>{footer}</th>" for footer in self.footers])
 
-    def sort(self, header, key=None, reverse=False):
-        if self._has_column(header):
-            idx = self.headers.index(header)
-            ziped_values = list(
-                zip(*[self._table_data[column] for column in self.headers])
-            )
-            if isinstance(key, dict):
-                key_dict = key
-                key = lambda x: key_dict[x]
-            ziped_values = merge_sort(ziped_values, idx, key, reverse)
-            ziped_values = transpose(ziped_values)
-            for header, values in zip(self.headers, ziped_values):
-                self._table_data[header] = list(values)
+    def sort(self, header=None, key=None, reverse=False, by=None, nulls="last"):
+        """Sorts the table in place. Either pass a single 'header' with an
+        optional 'key' (a function or a dict applied to the raw values) and
+        'reverse', or pass 'by' as a list of column names or
+        (column, ASC/DESC) pairs, optionally with a key function as a third
+        item. Without a key the cleaned values are compared. 'nulls' puts
+        missing values, None or blank, "first" or "last" regardless of the
+        direction."""
+        if nulls not in ("first", "last"):
+            raise ValueError(f'nulls must be "first" or "last", not {nulls!r}')
+        if by is None:
+            if not self._has_column(header):
+                return
+            by = [(header, DESC if reverse else ASC, key)]
+        sort_keys = []
+        for item in by:
+            if isinstance(item, str):
+                item = (item,)
+            column = item[0]
+            direction = getitem(item, 1, ASC)
+            column_key = getitem(item, 2)
+            if not self._has_column(column):
+                raise AttributeError(f"{self} does not have column {column}")
+            if direction not in (ASC, DESC):
+                raise ValueError(f"{direction!r} is not a sort direction")
+            sort_keys.append((column, direction == DESC, column_key))
+        positions = list(range(self.num_rows))
+        for column, descending, column_key in reversed(sort_keys):
+            if column_key is None:
+                values = list(self._iter_cleaned(column))
+            elif isinstance(column_key, dict):
+                values = [column_key[value] for value in self._table_data[column]]
+            else:
+                values = list(map(column_key, self._table_data[column]))
+            null_positions = [x for x in positions if is_null(values[x])]
+            if null_positions:
+                positions = [x for x in positions if not is_null(values[x])]
+            positions.sort(key=values.__getitem__, reverse=descending)
+            if null_positions:
+                if nulls == "first":
+                    positions = null_positions + positions
+                else:
+                    positions.extend(null_positions)
+        self._table_data.update(self._take_columns(positions))
+        self._invalidate_indexes()
 
     def _has_column(self, col):
         if col in self.headers:
@@ -969,6 +1622,7 @@ class BaseTable(metaclass=ABCMeta):
                 self.headers.index(header),
                 self,
                 self._settings,
+                self._get_converters().get(header),
             )
         else:
             raise AttributeError(f"{self} does not have column {header}")
@@ -988,6 +1642,7 @@ class BaseTable(metaclass=ABCMeta):
                 row_num,
                 self,
                 self._settings,
+                self._get_converters(),
             )
 
     def __getattr__(self, item):
@@ -1052,6 +1707,7 @@ class BaseTable(metaclass=ABCMeta):
                 self.num_cols += 1
                 if key not in self.headers:
                     self.headers.append(key)
+                self._invalidate_indexes(key)
             else:
                 raise ValueError(f"{type(value)} is not of type list")
         else:
@@ -1063,15 +1719,14 @@ class BaseTable(metaclass=ABCMeta):
                 formatted_item = item
                 del self._table_data[formatted_item]
                 self.headers.remove(formatted_item)
+                self._indexes.pop(formatted_item, None)
                 if item in self.column_types:
                     del self.column_types[item]
                 if self.num_cols > 0:
                     self.num_cols -= 1
         elif isinstance(item, int):
             if item < self.num_rows:
-                for col in self._table_data:
-                    del self._table_data[col][item]
-                self.num_rows -= 1
+                self._remove_row(item)
             else:
                 raise IndexError(f"{item} is out of range")
 
@@ -1217,31 +1872,118 @@ class CsvTable(BaseTable):
         super().__init__(headers, footers, column_types, name, settings)
         self.delimiter = delimiter
         try:
-            with open(file_path) as open_file:
+            with open(file_path, newline="") as open_file:
                 self._setup(open_file)
         except (TypeError, OSError):
             self._setup(file_path.split("\n"))
 
-    def _setup(self, obj):
-        if self.headers:
-            temp = DictReader(obj, delimiter=self.delimiter, fieldnames=self.headers)
-            self._read_file(temp)
+    @classmethod
+    def iter_chunks(
+        cls,
+        file_path,
+        rows=50000,
+        delimiter=",",
+        headers=None,
+        footers=None,
+        column_types=None,
+        name=None,
+        settings=None,
+    ):
+        """Yields tables of at most 'rows' rows each without ever reading the
+        whole file into memory. 'file_path' can be a path, an open file or a
+        string of csv data. The columns without a type in 'column_types' are
+        typed while the file is parsed, from a sample of every value read so
+        far (see infer.ColumnSampler), so a chunk is typed at least as wide as
+        the chunks before it."""
+        settings = settings or Settings()
+        column_types = dict(column_types or {})
+        samplers = {}
+        open_file = cls._open(file_path)
+        try:
+            for fieldnames, columns in cls._iter_columns(
+                open_file, delimiter, headers, rows
+            ):
+                types = dict(column_types)
+                inferred = set()
+                if not settings.do_not_guess_types:
+                    for header, column in zip(fieldnames, columns):
+                        if types.get(header) is None:
+                            sampler = samplers.get(header)
+                            if sampler is None:
+                                sampler = samplers[header] = infer.ColumnSampler()
+                            sampler.extend(column)
+                            types[header] = sampler.result() or "varchar"
+                            inferred.add(header)
+                table = DictOfListsTable(
+                    dict(zip(fieldnames, columns)),
+                    list(fieldnames),
+                    list(footers or []),
+                    types or None,
+                    name,
+                    settings,
+                )
+                # the headers may have been renamed by the settings
+                table._unverified.update(
+                    header
+                    for header, field in zip(table.headers, fieldnames)
+                    if field in inferred and table.column_types[header] != "varchar"
+                )
+                yield table
+        finally:
+            if open_file is not file_path and hasattr(open_file, "close"):
+                open_file.close()
+
+    @staticmethod
+    def _open(file_path):
+        if hasattr(file_path, "read"):
+            return file_path
+        try:
+            return open(file_path, newline="")
+        except (TypeError, OSError):
+            return file_path.split("\n")
+
+    @classmethod
+    def _iter_columns(cls, obj, delimiter, headers=None, chunk_rows=None):
+        """Reads the csv rows in batches of 'chunk_rows' (all of them when it is
+        None) and turns every batch straight into columns"""
+        csv_reader = reader(obj, delimiter=delimiter)
+        if headers:
+            fieldnames = list(headers)
         else:
-            temp = DictReader(obj, delimiter=self.delimiter)
-            self._read_file(temp)
+            fieldnames = next(csv_reader, None)
+            if fieldnames is None:
+                return
+        if cls.check_duplicates(fieldnames):
+            raise ValueError("duplicate headers")
+        width = len(fieldnames)
+        batch = []
+        for row in csv_reader:
+            if not row:
+                continue
+            if len(row) != width:
+                row = (row + [None] * width)[:width]
+            batch.append(row)
+            if chunk_rows and len(batch) >= chunk_rows:
+                yield fieldnames, [list(column) for column in zip(*batch)]
+                batch = []
+        if batch:
+            yield fieldnames, [list(column) for column in zip(*batch)]
+        elif not chunk_rows:
+            yield fieldnames, [[] for _ in fieldnames]
+
+    def _setup(self, obj):
+        self._read_file(obj)
 
     def _read_file(self, obj):
-        if obj:
-            if self.check_duplicates(obj.fieldnames):
-                raise ValueError("duplicate headers")
-            self._table_data["headers"] = list(obj.fieldnames)
-            obj = list(obj)
-            for x, row in enumerate(obj):
-                obj[x] = [row[header] for header in self._table_data["headers"]]
-            if self.is_empty(obj):
+        for fieldnames, columns in self._iter_columns(
+            obj, self.delimiter, self.headers
+        ):
+            self._table_data["headers"] = list(fieldnames)
+            if not columns or not columns[0]:
                 return
-            obj = transpose(obj)
-            for header, column in zip(self._table_data["headers"], obj):
+            if self.is_empty([[column[0] for column in columns]]):
+                return
+            for header, column in zip(fieldnames, columns):
                 self._table_data["table"][header] = column
         self._initialize()
 
@@ -1272,104 +2014,332 @@ class ExcelTable(BaseTable):
         column_types=None,
         name=None,
         settings=None,
+        read_only=False,
     ):
         super().__init__(headers, footers, column_types, name, settings)
-        self._setup(file_path)
         self.worksheet = worksheet
+        self.read_only = read_only
+        self._setup(file_path)
 
     def _setup(self, obj):
+        wb, ws = self._open_worksheet(obj, self.worksheet, self.read_only)
+        try:
+            for fieldnames, column_types, columns in self._iter_columns(
+                ws, self.headers, self.column_types
+            ):
+                self._table_data["headers"] = fieldnames
+                self._table_data["column_types"] = column_types
+                self._table_data["table"] = dict(zip(fieldnames, columns))
+        finally:
+            if self.read_only:
+                wb.close()
+        self._initialize()
+
+    @classmethod
+    def iter_chunks(
+        cls,
+        file_path,
+        rows=50000,
+        worksheet=0,
+        headers=None,
+        footers=None,
+        column_types=None,
+        name=None,
+        settings=None,
+    ):
+        """Yields tables of at most 'rows' rows each, reading the workbook in
+        read only mode so the sheet is never held in memory as a whole. Every
+        chunk gets the column types guessed from the start of the sheet."""
+        wb, ws = cls._open_worksheet(file_path, worksheet, True)
+        try:
+            for fieldnames, types, columns in cls._iter_columns(
+                ws, headers, column_types, rows
+            ):
+                yield DictOfListsTable(
+                    dict(zip(fieldnames, columns)),
+                    list(fieldnames),
+                    list(footers or []),
+                    dict(types),
+                    name,
+                    settings,
+                )
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _open_worksheet(file_path, worksheet, read_only):
         try:
             # noinspection PyUnresolvedReferences
             from openpyxl import load_workbook
+        except ImportError:
+            print("openpyxl is required in order to read an Excel file")
+            raise
+        wb = load_workbook(filename=str(file_path), read_only=read_only)
+        if isinstance(worksheet, int):
+            ws = wb[wb.sheetnames[worksheet]]
+        elif isinstance(worksheet, str):
+            ws = wb[worksheet]
+        else:
+            ws = wb[wb.sheetnames[0]]
+        return wb, ws
+
+    @classmethod
+    def _iter_columns(
+        cls, ws, headers=None, column_types=None, chunk_rows=None, sample_rows=100
+    ):
+        """Reads the rows below the header row as plain values and turns them
+        into columns in batches of 'chunk_rows' (all of them when it is None).
+        Only the first 'sample_rows' rows are read as cells, for their number
+        formats to guess the column types from."""
+        # a normal worksheet creates the cells it is asked for, so the sample
+        # must not reach past the last row
+        last_row = sample_rows + 1
+        if ws.max_row:
+            last_row = min(last_row, ws.max_row)
+        cell_rows = ws.iter_rows(min_row=1, max_row=last_row)
+        first_row = next(cell_rows, None)
+        if first_row is None:
+            return
+        if headers:
+            fieldnames = list(headers)
+        else:
+            fieldnames = [cell.value for cell in first_row]
+        sample = list(cell_rows)
+        if column_types:
+            column_types = dict(column_types)
+        else:
+            column_types = cls._guess_excel_types(sample, fieldnames)
+        converters = [
+            _EXCEL_CONVERTERS.get(column_types.get(header)) for header in fieldnames
+        ]
+        rows = chain(
+            ([cell.value for cell in row] for row in sample),
+            ws.iter_rows(min_row=len(sample) + 2, values_only=True),
+        )
+        width = len(fieldnames)
+        columns = [[] for _ in fieldnames]
+        for batch in chunked(rows, chunk_rows or 10000):
+            batch = [
+                row if len(row) == width else (tuple(row) + (None,) * width)[:width]
+                for row in batch
+            ]
+            for column, values in zip(columns, zip(*batch)):
+                column.extend(values)
+            if chunk_rows:
+                yield fieldnames, column_types, cls._convert(columns, converters)
+                columns = [[] for _ in fieldnames]
+        if not chunk_rows:
+            yield fieldnames, column_types, cls._convert(columns, converters)
+
+    @staticmethod
+    def _convert(columns, converters):
+        return [
+            list(map(converter, column)) if converter else column
+            for column, converter in zip(columns, converters)
+        ]
+
+    @classmethod
+    def _guess_excel_types(cls, rows, headers):
+        """Guesses the type of every column from the cells in 'rows' that have
+        a value, going by their number format and then by their value. A
+        column whose cells were guessed different types takes the wider one,
+        see infer.promote."""
+        column_types = {}
+        for x, header in enumerate(headers):
+            column_type = None
+            for row in rows:
+                if x < len(row) and row[x].value is not None:
+                    column_type = infer.promote(
+                        column_type, cls._guess_excel_type(row[x])
+                    )
+                    if column_type == "varchar":
+                        break
+            column_types[header] = column_type or "string"
+        return column_types
 
+    @staticmethod
+    def _guess_excel_type(cell):
+        number_format = cell.number_format
+        data_type = cell.data_type
+        val = str(cell.value)
+        if (
+            number_format
+            == '_("$"* #,##0.00_);_("$"* \(#,##0.00\);_("$"* "-"??_);_(@_)'
+            or number_format == '"$"#,##0.00'
+        ):
+            return "money"
+        elif number_format == "0%":
+            return "percent"
+        elif number_format == "0.00":
+            return "numeric"
+        elif number_format == "[h]:mm:ss;@":
+            return "interval"
+        elif (
+            number_format == "[$-409]h:mm:ss\ AM/PM;@"
+            or number_format == "[$-409]h:mm\ AM/PM;@"
+            or number_format == "h:mm:ss;@"
+            or number_format == "h:mm;@"
+        ):
+            return "time"
+        elif (
+            number_format == "mm-dd-yy"
+            or number_format == "mm/dd/yy"
+            or number_format == "mm-dd-yyyy"
+            or number_format == "mm/dd/yyyy"
+            or number_format == "mm/yyyy"
+            or number_format == "mm-yyyy"
+            or number_format == "mm/yy"
+            or number_format == "mm-yy"
+        ):
+            return "date"
+        # numbers and real dates go by their value before the text checks
+        # below, which would take a negative number for a date
+        elif isinstance(cell.value, datetime):
+            return "timestamp" if cell.value.time() else "date"
+        elif isinstance(cell.value, date):
+            return "date"
+        elif isinstance(cell.value, time):
+            return "time"
+        elif isinstance(cell.value, timedelta):
+            return "interval"
+        elif data_type == "n":
+            return infer.classify(cell.value)
+        elif ("/" in val or "-" in val) and ":" in val:
+            return "timestamp"
+        elif ("/" in val or "-" in val) and not re.search("[a-zA-Z]", val):
+            return "date"
+        else:
+            return "varchar"
+
+
+class XlsTable(BaseTable):
+    """Reads a legacy .xls workbook with xlrd, building every column straight
+    from the sheet with col_values() instead of converting it to .xlsx first.
+    The column types come from the xlrd cell types, and every cell is
+    converted to the type of its column, so a number in a text column becomes
+    text."""
+
+    def __init__(
+        self,
+        file_path,
+        worksheet=0,
+        headers=None,
+        footers=None,
+        column_types=None,
+        name=None,
+        settings=None,
+    ):
+        super().__init__(headers, footers, column_types, name, settings)
+        self.worksheet = worksheet
+        self._setup(file_path)
+
+    def _setup(self, obj):
+        try:
             # noinspection PyUnresolvedReferences
-            from openpyxl.utils import get_column_letter
+            import xlrd
         except ImportError:
-            print("openpyxl is required in order to read an Excel file")
+            print("xlrd is required in order to read an xls file")
             raise
-        wb = load_workbook(filename=str(obj))
-        if isinstance(self.worksheet, int):
-            ws = wb[wb.get_sheet_names()[self.worksheet]]
-        elif isinstance(self.worksheet, str):
-            ws = wb[self.worksheet]
+        book = xlrd.open_workbook(str(obj), on_demand=True)
+        try:
+            if isinstance(self.worksheet, str):
+                sheet = book.sheet_by_name(self.worksheet)
+            else:
+                sheet = book.sheet_by_index(self.worksheet or 0)
+            if sheet.nrows:
+                self._read_sheet(sheet, book.datemode)
+        finally:
+            book.release_resources()
+        self._initialize()
+
+    def _read_sheet(self, sheet, datemode):
+        if self.headers:
+            fieldnames = list(self.headers)
         else:
-            ws = wb[wb.get_sheet_names()[0]]
-        if not self.headers:
-            for cell in list(ws[f"A1:{get_column_letter(ws.max_column)}1"])[0]:
-                self._table_data["headers"].append(cell.value)
-        if not self.column_types:
-            self._guess_excel_types(
-                list(ws[f"A2:{get_column_letter(ws.max_column)}2"])[0]
+            fieldnames = [str(value) for value in sheet.row_values(0)]
+        self._table_data["headers"] = fieldnames
+        for x, header in enumerate(fieldnames):
+            if x < sheet.ncols:
+                values = sheet.col_values(x, 1)
+                types = sheet.col_types(x, 1)
+            else:
+                values = types = [0] * (sheet.nrows - 1)
+            column_type = self.column_types.get(header)
+            if not column_type:
+                column_type = self._guess_xls_type(values, types, datemode)
+            self._table_data["column_types"][header] = column_type
+            self._table_data["table"][header] = self._convert_xls(
+                values, types, column_type, datemode
             )
-        for col, header in zip(ws.columns, self._table_data["headers"]):
-            first = True
-            self._table_data["table"][header] = []
-            for cell in col:
-                if not first:
-                    if self._table_data["column_types"][header] == "interval":
-                        self._table_data["table"][header].append(
-                            timedelta(days=cell.value * 24)
-                        )
-                    elif self._table_data["column_types"][header] == "decimal":
-                        self._table_data["table"][header].append(
-                            Decimal(str(cell.value))
-                        )
-                    else:
-                        self._table_data["table"][header].append(cell.value)
-                else:
-                    first = False
-        self._initialize()
 
-    def _guess_excel_types(self, row):
-        for cell, header in zip(row, self._table_data["headers"]):
-            if cell.value is not None:
-                number_format = cell.number_format
-                data_type = cell.data_type
-                val = str(cell.value)
-                if (
-                    number_format
-                    == '_("$"* #,##0.00_);_("$"* \(#,##0.00\);_("$"* "-"??_);_(@_)'
-                    or number_format == '"$"#,##0.00'
-                ):
-                    self._table_data["column_types"][header] = "money"
-                elif number_format == "0%":
-                    self._table_data["column_types"][header] = "percent"
-                elif number_format == "0.00":
-                    self._table_data["column_types"][header] = "decimal"
-                elif number_format == "[h]:mm:ss;@":
-                    self._table_data["column_types"][header] = "interval"
-                elif (
-                    number_format == "[$-409]h:mm:ss\ AM/PM;@"
-                    or number_format == "[$-409]h:mm\ AM/PM;@"
-                    or number_format == "h:mm:ss;@"
-                    or number_format == "h:mm;@"
-                ):
-                    self._table_data["column_types"][header] = "time"
-                elif (
-                    number_format == "mm-dd-yy"
-                    or number_format == "mm/dd/yy"
-                    or number_format == "mm-dd-yyyy"
-                    or number_format == "mm/dd/yyyy"
-                    or number_format == "mm/yyyy"
-                    or number_format == "mm-yyyy"
-                    or number_format == "mm/yy"
-                    or number_format == "mm-yy"
-                ):
-                    self._table_data["column_types"][header] = "date"
-                elif ("/" in val or "-" in val) and ":" in val:
-                    self._table_data["column_types"][header] = "timestamp"
-                elif ("/" in val or "-" in val) and not re.search("[a-zA-Z]", val):
-                    self._table_data["column_types"][header] = "date"
-                elif number_format == "General" and data_type == "n":
-                    self._table_data["column_types"][header] = "integer"
+    @staticmethod
+    def _guess_xls_type(values, types, datemode):
+        # xlrd cell types: 1 text, 2 number, 3 date, 4 boolean, everything else
+        # is empty, blank or an error
+        column_type = None
+        for kind in {kind for kind in types if 0 < kind < 5}:
+            cells = [
+                value for value, cell_type in zip(values, types) if cell_type == kind
+            ]
+            if kind == 2:
+                if all(value == int(value) for value in cells):
+                    kind_type = "integer"
                 else:
-                    self._table_data["column_types"][header] = "string"
+                    kind_type = "numeric"
+            elif kind == 3:
+                if all(value < 1 for value in cells):
+                    kind_type = "time"
+                elif all(value == int(value) for value in cells):
+                    kind_type = "date"
+                else:
+                    kind_type = "timestamp"
+            elif kind == 4:
+                kind_type = "bool"
             else:
-                self._table_data["column_types"][header] = "string"
+                kind_type = "varchar"
+            column_type = infer.promote(column_type, kind_type)
+        return column_type or "varchar"
+
+    @staticmethod
+    def _convert_xls(values, types, column_type, datemode):
+        # noinspection PyUnresolvedReferences
+        from xlrd.xldate import xldate_as_datetime
+
+        text = column_type == "varchar"
+        column = []
+        append = column.append
+        for value, cell_type in zip(values, types):
+            if cell_type == 1:
+                append(value)
+                continue
+            if cell_type == 2:
+                # xlrd hands every number over as a float
+                if value == int(value):
+                    value = int(value)
+                if column_type == "numeric":
+                    value = Decimal(repr(value))
+            elif cell_type == 3:
+                value = xldate_as_datetime(value, datemode)
+                if column_type == "date":
+                    value = value.date()
+                elif column_type == "time":
+                    value = value.time()
+            elif cell_type == 4:
+                value = bool(value)
+            else:
+                append(None)
+                continue
+            append(str(value) if text else value)
+        return column
 
 
 class SqlAlcTable(BaseTable):
-    __slots__ = "query"
+    """A table from the rows of a SQLAlchemy query. When given a result with
+    fetchmany() the rows are fetched 'batch_size' at a time and appended to
+    the columns, straight into typed columns when the settings ask for them,
+    instead of holding every row and a transposed copy of them at once."""
+
+    __slots__ = ("query", "batch_size")
 
     def __init__(
         self,
@@ -1379,12 +2349,62 @@ class SqlAlcTable(BaseTable):
         column_types=None,
         name=None,
         settings=None,
+        batch_size=10000,
     ):
         super().__init__(None, footers, column_types, name, settings)
         self.query = query
+        self.batch_size = batch_size
         self._setup(result)
 
+    @classmethod
+    def stream(
+        cls,
+        result,
+        batch_size=10000,
+        query=None,
+        footers=None,
+        column_types=None,
+        name=None,
+        settings=None,
+    ):
+        """Yields a table for every 'batch_size' rows fetched from 'result'.
+        The column types are read once from 'query' or the result itself.
+        Execute the statement with execution_options(stream_results=True) for
+        the database to hand the rows over from a server side cursor."""
+        headers, types = cls._result_types(result, query, column_types)
+        for rows in cls._fetch_batches(result, batch_size):
+            yield DictOfListsTable(
+                {header: list(values) for header, values in zip(headers, zip(*rows))},
+                list(headers),
+                list(footers or []),
+                dict(types),
+                name,
+                settings,
+            )
+
+    @staticmethod
+    def _result_types(result, query=None, column_types=None):
+        if query is not None:
+            types = get_sql_query_types(query)
+        else:
+            types = get_result_types(result)
+        headers = list(types.keys())
+        if column_types:
+            types.update(column_types)
+        return headers, types
+
+    @staticmethod
+    def _fetch_batches(result, batch_size):
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
     def _setup(self, obj):
+        if hasattr(obj, "fetchmany"):
+            self._setup_result(obj)
+            return
         if not isinstance(obj, list):
             obj = [obj]
         if self.query and not self.column_types:
@@ -1394,13 +2414,43 @@ class SqlAlcTable(BaseTable):
             self._table_data["headers"] = list(self.column_types.keys())
         else:
             if obj:
-                self._table_data["headers"] = [str(key) for key in obj[0].keys()]
+                keys = getattr(obj[0], "_fields", None) or obj[0].keys()
+                self._table_data["headers"] = [str(key) for key in keys]
         if obj:
             obj = transpose(obj)
             for header, column in zip(self._table_data["headers"], obj):
                 self._table_data["table"][header] = column
         self._initialize()
 
+    def _setup_result(self, result):
+        headers, self.column_types = self._result_types(
+            result, self.query, self.column_types
+        )
+        self._standardize_types()
+        columns = {}
+        for header in headers:
+            column_type = self.column_types.get(header)
+            if self._settings.typed_columns and column_type in TYPECODES:
+                columns[header] = TypedColumn(
+                    column_type,
+                    converter=compile_converter(column_type, self._settings),
+                )
+            else:
+                columns[header] = []
+        for rows in self._fetch_batches(result, self.batch_size):
+            for header, values in zip(headers, zip(*rows)):
+                column = columns[header]
+                length = len(column)
+                try:
+                    column.extend(values)
+                except (ValueError, TypeError, ArithmeticError):
+                    # values a typed column can't hold keep the column a list
+                    columns[header] = list(column)[:length]
+                    columns[header].extend(values)
+        self._table_data["headers"] = headers
+        self._table_data["table"] = columns
+        self._initialize()
+
 
 class HtmlTable(BaseTable):
     __slots__ = "_parser"
@@ -1422,6 +2472,34 @@ class HtmlTable(BaseTable):
         self._table_data = self._parser(html)
         self._initialize()
 
+    @classmethod
+    def iter_tables(
+        cls,
+        source,
+        chunk_size=65536,
+        encoding="utf-8",
+        footers=None,
+        name=None,
+        settings=None,
+    ):
+        """Yields a table for every <table> in 'source' in a single pass with
+        HtmlParser. 'source' is a string of HTML, a path or a file like object
+        which is read 'chunk_size' characters at a time so a table is yielded
+        as soon as it has been read."""
+        if isinstance(source, PathLike):
+            with open(source, encoding=encoding) as file:
+                yield from cls.iter_tables(
+                    file, chunk_size, encoding, footers, name, settings
+                )
+            return
+        if hasattr(source, "read"):
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+        else:
+            chunks = [source]
+        for table_data in HtmlParser().iter_parse(chunks, encoding):
+            # the table is already parsed so the parser hands it over as is
+            yield cls(table_data, lambda parsed: parsed, footers, None, name, settings)
+
 
 class ListOfListsTable(BaseTable):
     def __init__(
@@ -1466,20 +2544,49 @@ class ListOfDictsTable(BaseTable):
             self._initialize()
 
 
+class DictOfListsTable(BaseTable):
+    def __init__(
+        self,
+        columns,
+        headers=None,
+        footers=None,
+        column_types=None,
+        name=None,
+        settings=None,
+    ):
+        super().__init__(headers, footers, column_types, name, settings)
+        self._setup(columns)
+
+    def _setup(self, obj):
+        if obj:
+            self._table_data["headers"] = [str(key) for key in obj.keys()]
+            for header, column in obj.items():
+                self._table_data["table"][str(header)] = column
+        self._initialize()
+
+
 LXML_TYPE_MAP = {
     "IntElement": "integer",
+    "FloatElement": "numeric",
     "StringElement": "varchar",
     "BoolElement": "bool",
 }
 
+# how the values of each lxml element type are turned into python values
+_LXML_PYVALS = {
+    "IntElement": int,
+    "FloatElement": float,
+    "BoolElement": lambda text: text == "true",
+}
+
 
 class LxmlTable(BaseTable):
     def __init__(
         self, xml_obj, pyval=False, name=None, settings=None,
     ):
         super().__init__(None, None, None, name, settings)
-        self._setup(xml_obj)
         self._pyval = pyval
+        self._setup(xml_obj)
 
     def _setup(self, xml_obj):
         headers = []
@@ -1493,7 +2600,7 @@ class LxmlTable(BaseTable):
                         .replace("<class 'lxml.objectify.", "")
                         .replace("'>", "")
                     )
-                    column_types[child.tag] = LXML_TYPE_MAP[child_type]
+                    column_types[child.tag] = LXML_TYPE_MAP.get(child_type, "varchar")
         self._table_data["headers"] = headers
         self._table_data["column_types"] = column_types
         for row in xml_obj:
@@ -1511,6 +2618,105 @@ class LxmlTable(BaseTable):
                     self._table_data["table"][header].append(value)
         self._initialize()
 
+    @classmethod
+    def from_file(
+        cls, path, row_tag=None, pyval=False, name=None, settings=None, sample_rows=100
+    ):
+        """Reads a table from an XML file with iterparse so the document is
+        never held as a tree. Every element tagged 'row_tag' is a row, or every
+        child of the root when it is None, and the children of a row are its
+        cells. Rows are cleared once read and the column types are guessed from
+        the first 'sample_rows' rows the way objectify would type them. Like
+        any sampled type they are checked against every value and widened on
+        the first full pass over a column."""
+        try:
+            # noinspection PyUnresolvedReferences
+            from lxml import etree
+        except ImportError:
+            print("lxml is required in order to read an XML file")
+            raise
+        headers = []
+        columns = {}
+        num_rows = 0
+        for row in cls._iter_rows(etree, str(path), row_tag):
+            values = {}
+            for child in row:
+                if child.tag not in columns:
+                    headers.append(child.tag)
+                    columns[child.tag] = [""] * num_rows
+                values[child.tag] = child.text or ""
+            for header in headers:
+                columns[header].append(values.get(header, ""))
+            num_rows += 1
+            row.clear()
+            while row.getprevious() is not None:
+                del row.getparent()[0]
+        column_types = {}
+        for header in headers:
+            element_type = cls._guess_lxml_type(columns[header][:sample_rows])
+            column_types[header] = LXML_TYPE_MAP[element_type]
+            if pyval and element_type in _LXML_PYVALS:
+                columns[header] = cls._pyvals(columns[header], element_type)
+        table = DictOfListsTable(columns, headers, None, column_types, name, settings)
+        table._unverified.update(
+            header
+            for header in table.headers
+            if table.column_types[header] != "varchar"
+        )
+        return table
+
+    @staticmethod
+    def _iter_rows(etree, path, row_tag):
+        if row_tag is not None:
+            for _, element in etree.iterparse(path, events=("end",), tag=row_tag):
+                yield element
+            return
+        root = None
+        for event, element in etree.iterparse(path, events=("start", "end")):
+            if root is None:
+                root = element
+            elif event == "end" and element.getparent() is root:
+                yield element
+
+    @staticmethod
+    def _guess_lxml_type(values):
+        """Returns the objectify element type that fits every value"""
+        found = None
+        for text in values:
+            text = text.strip()
+            if not text:
+                continue
+            if text in ("true", "false"):
+                element_type = "BoolElement"
+            else:
+                try:
+                    int(text)
+                    element_type = "IntElement"
+                except ValueError:
+                    try:
+                        float(text)
+                        element_type = "FloatElement"
+                    except ValueError:
+                        return "StringElement"
+            if found is None or found == element_type:
+                found = element_type
+            elif {found, element_type} == {"IntElement", "FloatElement"}:
+                found = "FloatElement"
+            else:
+                return "StringElement"
+        return found or "StringElement"
+
+    @staticmethod
+    def _pyvals(column, element_type):
+        convert = _LXML_PYVALS[element_type]
+        values = []
+        for text in column:
+            try:
+                values.append(convert(text.strip()) if text.strip() else text)
+            except ValueError:
+                values.append(text)
+        return values
+
 
 class Table(BaseTable):
     def __init__(
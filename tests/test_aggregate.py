@@ -0,0 +1,66 @@
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from veritas import Aggregator, DictOfListsTable
+
+
+def chunk(regions, amounts):
+    return DictOfListsTable(
+        {"region": regions, "amount": amounts},
+        column_types={"region": "varchar", "amount": "numeric"},
+    )
+
+
+def add(state, value):
+    return state + value
+
+
+def test_blank_values_are_skipped():
+    table = chunk(["n", "n", "s"], ["1.5", "", ""])
+    result = table.group_by("region").agg(
+        total=("amount", "sum"),
+        mean=("amount", "avg"),
+        values=("amount", "count"),
+        rows=(None, "count"),
+    )
+    assert result.to_list_of_lists() == [
+        ["n", Decimal("1.5"), Decimal("1.5"), 1, 2],
+        ["s", None, None, 0, 1],
+    ]
+
+
+def test_partial_merge_finalize():
+    aggregations = {"total": ("amount", "sum"), "mean": ("amount", "avg")}
+    first = chunk(["n", "s"], ["1", "2"]).group_by("region").partial(**aggregations)
+    second = chunk(["s", "w"], ["4", ""]).group_by("region").partial(**aggregations)
+    assert first.groups[("s",)] == [Decimal(2), (Decimal(2), 1)]
+    merged = first.merge(second)
+    assert merged.to_table().to_list_of_lists() == [
+        ["n", Decimal(1), Decimal(1)],
+        ["s", Decimal(6), Decimal(3)],
+        ["w", None, None],
+    ]
+
+
+def test_merged_states_must_match():
+    table = chunk(["n"], ["1"])
+    first = table.group_by("region").partial(total=("amount", "sum"))
+    second = table.group_by("region").partial(total=("amount", "max"))
+    with pytest.raises(ValueError):
+        first.merge(second)
+
+
+def test_states_survive_pickling():
+    states = chunk(["n"], ["1"]).group_by("region").partial(n=(None, "count"))
+    specs = pickle.loads(pickle.dumps(states.specs))
+    assert specs[0][2] is states.specs[0][2]
+
+
+def test_unregistered_aggregator_pickles():
+    total = Aggregator("total", int, add, add, column_type="integer")
+    copy = pickle.loads(pickle.dumps(total))
+    assert copy is not total
+    assert (copy.name, copy.update, copy.column_type) == ("total", add, "integer")
+    assert copy.finalize(3) == 3
@@ -0,0 +1,30 @@
+import pytest
+
+from veritas import DictOfListsTable
+
+
+def table():
+    return DictOfListsTable(
+        {"name": ["a", "b", "c"], "n": ["1", "2", "3"]},
+        column_types={"name": "varchar", "n": "integer"},
+    )
+
+
+def test_to_csv():
+    assert table().to_csv() == "name,n\na,1\nb,2\nc,3\n"
+
+
+def test_to_csv_header_positionally():
+    assert table().to_csv(False) == "a,1\nb,2\nc,3\n"
+
+
+def test_to_csv_chunks(tmp_path):
+    path = tmp_path / "out.csv"
+    table().to_csv(path_or_file=path, chunk_rows=2)
+    assert path.read_text() == "name,n\na,1\nb,2\nc,3\n"
+
+
+@pytest.mark.parametrize("chunk_rows", [0, -1])
+def test_to_csv_rejects_empty_chunks(chunk_rows):
+    with pytest.raises(ValueError):
+        table().to_csv(chunk_rows=chunk_rows)
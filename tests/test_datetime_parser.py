@@ -0,0 +1,65 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from veritas import Settings
+from veritas.util import DateTimeParser, compile_converter
+
+
+def test_iso_values():
+    parser = DateTimeParser()
+    assert parser.parse("2024-01-02") == datetime(2024, 1, 2)
+    assert parser.parse("2024-01-02T10:30:00") == datetime(2024, 1, 2, 10, 30)
+    assert parser._format == "iso"
+
+
+def test_detected_format_is_kept():
+    parser = DateTimeParser()
+    assert parser.parse("01/02/2024") == datetime(2024, 1, 2)
+    assert parser._format == "%m/%d/%Y"
+    assert parser.parse("12/31/2023") == datetime(2023, 12, 31)
+    assert parser._format == "%m/%d/%Y"
+
+
+def test_given_format_is_tried_first():
+    parser = DateTimeParser("%d/%m/%Y")
+    assert parser.parse("01/02/2024") == datetime(2024, 2, 1)
+
+
+def test_format_change_partway_through_a_column():
+    parser = DateTimeParser()
+    assert parser.parse("01/02/2024") == datetime(2024, 1, 2)
+    assert parser.parse("2024/03/04") == datetime(2024, 3, 4)
+    assert parser._format == "%Y/%m/%d"
+    assert parser.parse("05-Jun-2024") == datetime(2024, 6, 5)
+    assert parser._format == "%d-%b-%Y"
+
+
+def test_dateutil_fallback():
+    pytest.importorskip("dateutil")
+    parser = DateTimeParser()
+    assert parser.parse("2 January 2024 10:30") == datetime(2024, 1, 2, 10, 30)
+
+
+def test_values_without_a_date_are_put_on_today():
+    parsed = DateTimeParser().parse("10:30:00")
+    assert (parsed.date(), parsed.time()) == (date.today(), time(10, 30))
+
+
+@pytest.mark.parametrize("value", [None, "", "n/a"])
+def test_unparseable_values_are_returned(value):
+    assert DateTimeParser().parse(value) == value
+
+
+@pytest.mark.parametrize("value, expected", [(None, None), ("", ""), ("-", None)])
+def test_converter_nulls(value, expected):
+    convert = compile_converter("date", Settings())
+    assert convert(value) == expected
+
+
+def test_repeated_values_are_parsed_once():
+    parser = DateTimeParser(memo_size=2)
+    for _ in range(3):
+        parser.parse("2024-01-02")
+    info = parser.parse.cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (2, 1, 2)
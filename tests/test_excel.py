@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from veritas import DictOfListsTable, ExcelTable
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def table():
+    return DictOfListsTable(
+        {"day": [date(2024, 1, 2)], "amount": ["1.5"]},
+        column_types={"day": "date", "amount": "numeric"},
+    )
+
+
+@pytest.mark.parametrize("write_only", [False, True])
+def test_dates_keep_a_date_format(tmp_path, write_only):
+    path = tmp_path / "out.xlsx"
+    table().to_excel(write_only=write_only).save(path)
+    ws = openpyxl.load_workbook(path).worksheets[0]
+    assert ws["A2"].is_date
+    assert ws["A2"].value.date() == date(2024, 1, 2)
+
+
+def test_formatter_sets_number_format(tmp_path):
+    path = tmp_path / "out.xlsx"
+
+    def formatter(column_type, header):
+        if column_type == "numeric":
+            return "0.00"
+
+    table().to_excel(formatter).save(path)
+    ws = openpyxl.load_workbook(path).worksheets[0]
+    assert ws["B2"].number_format == "0.00"
+    assert ws["A2"].is_date
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_types_are_guessed_from_a_sample(tmp_path, read_only):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["whole", "mixed", "text"])
+    ws.append([1, 1, "a"])
+    ws.append([2, 1.5, 3])
+    path = tmp_path / "in.xlsx"
+    wb.save(path)
+    table = ExcelTable(path, read_only=read_only)
+    assert table.column_types == {
+        "whole": "integer",
+        "mixed": "numeric",
+        "text": "varchar",
+    }
+    assert table.to_list_of_lists() == [
+        [1, Decimal("1"), "a"],
+        [2, Decimal("1.5"), "3"],
+    ]
+
+
+def test_negative_numbers_are_not_dates(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["n", "day", "code"])
+    ws.append([5, datetime(2024, 1, 2), "a-1"])
+    ws.append([-3, datetime(2024, 1, 3, 10, 30), "2024-01-02"])
+    ws.append([2, datetime(2024, 1, 4), "b"])
+    path = tmp_path / "in.xlsx"
+    wb.save(path)
+    table = ExcelTable(path)
+    assert table.column_types == {
+        "n": "integer",
+        "day": "timestamp",
+        "code": "varchar",
+    }
+    assert table["n"].cells == [5, -3, 2]
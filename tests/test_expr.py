@@ -0,0 +1,38 @@
+import pytest
+
+from veritas import DictOfListsTable
+from veritas.expr import Columns
+
+
+def amounts():
+    return DictOfListsTable(
+        {"region": ["EU", "US", "EU", "APAC"], "amount": ["10", "", "30", "40"]},
+        column_types={"region": "varchar", "amount": "numeric"},
+    )
+
+
+def test_where():
+    table = amounts()
+    mask = (table.c.amount > 15) & table.c.region.isin({"EU", "US"})
+    assert table.where(mask).to_list_of_lists() == [["EU", 30]]
+
+
+def test_blank_values_are_null():
+    table = amounts()
+    assert (table.c.amount > 0).count() == 3
+    assert (table.c.amount != 10).count() == 2
+    assert (table.c.amount == None).count() == 1  # noqa: E711
+    assert table.c.amount.isnull().count() == 1
+    assert table.c.amount.notnull().count() == 3
+
+
+def test_compare_to_null_raises():
+    table = amounts()
+    with pytest.raises(TypeError):
+        table.c.amount > None
+
+
+def test_column_named_c_is_not_shadowed():
+    table = DictOfListsTable({"c": [1, 2], "d": [3, 4]})
+    assert table.c.to_list() == [1, 2]
+    assert table.where(Columns(table).c == 2).to_list_of_lists() == [[2, 4]]
@@ -0,0 +1,129 @@
+import pytest
+
+from veritas import DictOfListsTable, HtmlTable
+from veritas.util import BeautifulSoupParser, HtmlParser, unique_headers
+
+SPANS = """
+<table>
+  <tr><th>a</th><th colspan="2">bc</th></tr>
+  <tr><td>1</td><td>2</td><td rowspan="2">3</td></tr>
+  <tr><td>4</td></tr>
+</table>
+"""
+
+REPEATED = """
+<table>
+  <tr><th>x</th><th>x</th><th>y</th></tr>
+  <tr><td>1</td><td>2</td><td>3</td></tr>
+</table>
+"""
+
+TRAILING_ROWSPAN = """
+<table>
+  <tr><th>a</th><th>b</th><th>c</th></tr>
+  <tr><td>1</td><td>2</td><td rowspan="2">3</td></tr>
+  <tr><td>4</td></tr>
+</table>
+"""
+
+
+def html_parser_table(html):
+    return HtmlTable(html, HtmlParser().parse)
+
+
+def test_unique_headers():
+    assert unique_headers(["a", "b", "a", "a"]) == ["a", "b", "a_2", "a_3"]
+    assert unique_headers(["a", "a", "a_2"]) == ["a", "a_3", "a_2"]
+
+
+def test_colspan_header_keeps_every_column():
+    table = html_parser_table(SPANS)
+    assert table.headers == ["a", "bc", "bc_2"]
+    assert table._table_data["bc"] == ["2", ""]
+    assert table._table_data["bc_2"] == ["3", "3"]
+
+
+def test_repeated_header_keeps_every_column():
+    table = html_parser_table(REPEATED)
+    assert table.headers == ["x", "x_2", "y"]
+    assert [table._table_data[header] for header in table.headers] == [
+        ["1"],
+        ["2"],
+        ["3"],
+    ]
+
+
+def test_iter_tables():
+    tables = list(HtmlTable.iter_tables(SPANS + REPEATED))
+    assert [table.headers for table in tables] == [
+        ["a", "bc", "bc_2"],
+        ["x", "x_2", "y"],
+    ]
+
+
+@pytest.mark.parametrize("parser", [HtmlParser, BeautifulSoupParser])
+def test_rowspan_past_the_last_cell(parser):
+    table = HtmlTable(TRAILING_ROWSPAN, parser().parse)
+    assert table.headers == ["a", "b", "c"]
+    assert [table._table_data[header] for header in table.headers] == [
+        ["1", "4"],
+        ["2", ""],
+        ["3", "3"],
+    ]
+
+
+def test_beautifulsoup_gap_before_rowspan():
+    html = """
+    <table>
+      <tr><th>a</th><th>b</th><th>c</th><th>d</th></tr>
+      <tr><td>1</td><td>2</td><td>3</td><td rowspan="2">4</td></tr>
+      <tr><td>5</td></tr>
+    </table>
+    """
+    table = HtmlTable(html, BeautifulSoupParser().parse)
+    assert [table._table_data[header] for header in table.headers] == [
+        ["1", "5"],
+        ["2", ""],
+        ["3", ""],
+        ["4", "4"],
+    ]
+
+
+def numbers():
+    return DictOfListsTable({"a": ["1", "2", "3"], "b": ["1000", "", "2.5"]})
+
+
+def test_col_totals():
+    html = numbers().to_html_table(col_totals=True)
+    assert '<td class="coltotal">6</td><td class="coltotal">1,002.5</td>' in html
+
+
+def test_pages():
+    table = numbers()
+    assert table.to_html_table(page=1, page_size=2).count("<tr>") == 3
+    last = table.to_html_table(page=2, page_size=2)
+    assert "<tbody><tr><td>3</td><td>2.5</td></tr></tbody>" in last
+    assert "<tbody></tbody>" in table.to_html_table(page=3, page_size=2)
+
+
+def test_totals_of_a_page_add_up_that_page():
+    html = numbers().to_html_table(
+        page=2, page_size=2, row_totals=True, col_totals=True
+    )
+    assert '<td class="rowtotal">5.5</td>' in html
+    assert (
+        '<td class="coltotal">3</td><td class="coltotal">2.5</td>'
+        '<td class="grandtotal">5.5</td>'
+    ) in html
+
+
+def test_streamed_pages_match_the_string():
+    table = numbers()
+    streamed = "".join(table.iter_html(chunk_rows=1, page=1, page_size=2))
+    assert streamed == table.to_html_table(page=1, page_size=2)
+
+
+@pytest.mark.parametrize("page, page_size", [(0, 2), (1, 0), (2, None)])
+def test_bad_pages_raise(page, page_size):
+    with pytest.raises(ValueError):
+        numbers().to_html_table(page=page, page_size=page_size)
@@ -0,0 +1,84 @@
+import pytest
+
+from veritas import DictOfListsTable
+from veritas.index import BaseIndex
+
+
+def indexed_table(kind="hash", unique=False):
+    table = DictOfListsTable({"v": [10, 20, 30]}, column_types={"v": "integer"})
+    return table.create_index("v", unique, kind)
+
+
+@pytest.mark.parametrize("kind", ["hash", "sorted"])
+def test_lookup(kind):
+    table = indexed_table(kind)
+    assert table.lookup("v", 20) == [1]
+    assert table.lookup("v", "20") == [1]
+    assert table.lookup("v", 40) == []
+
+
+@pytest.mark.parametrize("kind", ["hash", "sorted"])
+def test_col_assignment_updates_index(kind):
+    table = indexed_table(kind)
+    table["v"][1] = "999"
+    assert table.lookup("v", 999) == [1]
+    assert table.lookup("v", 20) == []
+
+
+def test_cell_assignment_through_col_updates_index():
+    table = indexed_table()
+    table["v"][2].value = 5
+    assert table.lookup("v", 5) == [2]
+    assert table.lookup("v", 30) == []
+
+
+def test_unique_index_refuses_duplicates():
+    table = indexed_table(unique=True)
+    with pytest.raises(ValueError):
+        table["v"][0] = 20
+    assert table["v"].cells == [10, 20, 30]
+
+
+def test_base_index_is_abstract():
+    with pytest.raises(TypeError):
+        BaseIndex("v")
+
+
+def test_sorted_index_range():
+    table = DictOfListsTable({"v": [30, 10, 20, 40]}, column_types={"v": "integer"})
+    index = table.create_index("v", kind="sorted")._indexes["v"]
+    assert index.range(15, 35) == [2, 0]
+    assert index.range(10, 20, low_inclusive=False) == [2]
+    assert table.between("v", 15, 35).to_list_of_lists() == [[30], [20]]
+
+
+def blank_table():
+    return DictOfListsTable(
+        {"v": ["30", "", "10", None]}, column_types={"v": "integer"}
+    )
+
+
+@pytest.mark.parametrize("kind", [None, "hash", "sorted"])
+def test_blanks_are_not_indexed(kind):
+    table = blank_table()
+    if kind:
+        table.create_index("v", kind=kind)
+    assert table.lookup("v", 10) == [2]
+    assert table.lookup("v", "") == []
+    assert table.between("v", 0, 100).to_list_of_lists() == [[30], [10]]
+    assert (table.min("v"), table.max("v")) == (10, 30)
+
+
+def test_blank_added_to_sorted_index_is_skipped():
+    table = blank_table().create_index("v", kind="sorted")
+    table["v"][0] = ""
+    index = table._indexes["v"]
+    assert len(index) == 1
+    assert index.range() == [2]
+    assert table.min("v") == table.max("v") == 10
+
+
+def test_unique_index_allows_several_blanks():
+    table = blank_table().create_index("v", unique=True, kind="sorted")
+    table["v"][2] = ""
+    assert table.lookup("v", 30) == [0]
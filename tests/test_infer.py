@@ -0,0 +1,109 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from veritas import CsvTable, DictOfListsTable
+from veritas.infer import ColumnSampler, classify, infer_type, promote
+
+
+@pytest.mark.parametrize(
+    "value, column_type",
+    [
+        ("12", "integer"),
+        ("1,234", "integer"),
+        ("9999999999", "bigint"),
+        ("1.5", "numeric"),
+        ("2024-01-02", "date"),
+        ("2024-01-02 10:30:00", "timestamp"),
+        ("10:30", "time"),
+        ("$1.50", "money"),
+        ("15%", "percent"),
+        ("True", "bool"),
+        ("abc", "varchar"),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_classify(value, column_type):
+    assert classify(value) == column_type
+
+
+def test_promote():
+    assert promote("integer", "numeric") == "numeric"
+    assert promote("date", "timestamp") == "timestamp"
+    assert promote("integer", "date") == "varchar"
+    assert promote(None, "integer") == "integer"
+
+
+def test_infer_type_is_repeatable():
+    column = [str(x) for x in range(5000)] + ["1.5"] * 10
+    assert infer_type(column) == infer_type(column)
+
+
+def test_column_sampler_matches_in_memory_inference():
+    sampler = ColumnSampler()
+    column = [str(x) for x in range(3000)]
+    for start in range(0, len(column), 700):
+        sampler.extend(column[start : start + 700])
+    assert sampler.result() == "integer"
+
+
+def bad_value_outside_sample():
+    values = [str(x) for x in range(100000)]
+    values[70001] = "N/A"
+    return DictOfListsTable({"v": values})
+
+
+def test_value_outside_sample_doesnt_break_row_access():
+    table = bad_value_outside_sample()
+    assert table.column_types["v"] == "integer"
+    assert table[70001]["v"].value == "N/A"
+
+
+@pytest.mark.parametrize(
+    "full_pass",
+    [
+        lambda table: table.to_csv(),
+        lambda table: json.loads(table.to_json()),
+        lambda table: table.sort("v"),
+        lambda table: table.where(table.c.v == "5"),
+    ],
+)
+def test_full_pass_widens_type_past_value_outside_sample(full_pass):
+    table = bad_value_outside_sample()
+    full_pass(table)
+    assert table.column_types["v"] == "varchar"
+
+
+def test_where_after_widening():
+    table = bad_value_outside_sample()
+    assert table.where(table.c.v == "5").to_list_of_lists() == [["5"]]
+
+
+def test_widening_stays_in_chain():
+    values = ["1"] * 200 + ["2.5"] + ["3"] * 5000
+    table = DictOfListsTable({"v": values})
+    table.to_csv()
+    assert table.column_types["v"] == "numeric"
+    assert table.to_list_of_lists()[200] == [Decimal("2.5")]
+
+
+def test_given_types_are_not_changed():
+    table = DictOfListsTable({"v": ["1", "x"]}, column_types={"v": "integer"})
+    assert table.to_list_of_lists() == [[1], ["x"]]
+    assert table.column_types["v"] == "integer"
+
+
+def test_iter_chunks_types_while_parsing():
+    csv = "a,b\n" + "".join(f"{x},{x}\n" for x in range(250)) + "1.5,x\n"
+    chunks = list(CsvTable.iter_chunks(csv, rows=100))
+    assert [chunk.num_rows for chunk in chunks] == [100, 100, 51]
+    assert chunks[0].column_types == {"a": "integer", "b": "integer"}
+    assert chunks[-1].column_types == {"a": "numeric", "b": "varchar"}
+
+
+def test_iter_chunks_keeps_given_types():
+    csv = "a,b\n1,2\n3,4\n"
+    (chunk,) = CsvTable.iter_chunks(csv, column_types={"b": "varchar"})
+    assert chunk.column_types == {"a": "integer", "b": "varchar"}
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+import pytest
+
+from veritas import DictOfListsTable, Settings, TypedColumn
+
+
+def table():
+    return DictOfListsTable(
+        {"id": ["1", "2"], "unit price": ["1.5", ""], "class": ["a", "b"]}
+    )
+
+
+def test_itertuples():
+    assert list(table().itertuples("id", "class")) == [(1, "a"), (2, "b")]
+    assert list(table().itertuples("id", cleaned=False)) == [("1",), ("2",)]
+
+
+def test_itertuples_unknown_column_raises():
+    with pytest.raises(AttributeError):
+        table().itertuples("missing")
+
+
+def test_named_tuples_rename_invalid_identifiers():
+    first = next(table().itertuples(named=True))
+    assert first._fields == ("id", "_1", "_2")
+    assert first.id == 1
+    assert first._1 == Decimal("1.5")
+
+
+def test_named_tuples_rename_duplicate_columns():
+    first = next(table().itertuples("id", "id", named=True))
+    assert first._fields == ("id", "_1")
+    assert tuple(first) == (1, 1)
+
+
+def test_itertuples_index():
+    assert list(table().itertuples("class", index=True)) == [(0, "a"), (1, "b")]
+    rows = list(table().itertuples("id", named=True, index=True))
+    assert [(row.Index, row.id) for row in rows] == [(0, 1), (1, 2)]
+
+
+def test_iter_columns():
+    columns = dict(table().iter_columns())
+    assert columns["unit price"] == [Decimal("1.5"), ""]
+    assert list(dict(table().iter_columns("id", cleaned=False))) == ["id"]
+
+
+def test_iter_columns_over_typed_columns():
+    typed = DictOfListsTable(
+        {"n": ["1", "", "3"]}, settings=Settings(typed_columns=True)
+    )
+    ((header, values),) = typed.iter_columns()
+    assert (header, values) == ("n", [1, None, 3])
+    ((_, raw),) = typed.iter_columns(cleaned=False)
+    assert isinstance(raw, TypedColumn)
+    assert list(typed.itertuples()) == [(1,), (None,), (3,)]
@@ -0,0 +1,74 @@
+import pytest
+
+from veritas import DictOfListsTable
+
+
+def left_table():
+    return DictOfListsTable(
+        {"k": [1, 2, 3], "a": ["x", "y", "z"]},
+        column_types={"k": "integer", "a": "varchar"},
+    )
+
+
+def test_inner_join():
+    right = DictOfListsTable(
+        {"k": [3, 1], "b": ["p", "q"]}, column_types={"k": "integer", "b": "varchar"}
+    )
+    joined = left_table().join(right, "k")
+    assert joined.headers == ["k", "a", "b"]
+    assert sorted(joined.to_list_of_lists()) == [[1, "x", "q"], [3, "z", "p"]]
+
+
+def test_sorted_keys_of_different_types_are_matched():
+    right = DictOfListsTable(
+        {"k": ["1", "2", "4"], "b": ["p", "q", "r"]},
+        column_types={"k": "varchar", "b": "varchar"},
+    )
+    joined = left_table().join(right, "k", how="outer")
+    assert joined.to_list_of_lists() == [
+        [1, "x", "p"],
+        [2, "y", "q"],
+        [3, "z", None],
+        [4, None, "r"],
+    ]
+
+
+def test_sorted_keys_that_cant_be_compared_fall_back_to_hashing():
+    right = DictOfListsTable(
+        {"k": ["a", "b"], "b": ["p", "q"]},
+        column_types={"k": "varchar", "b": "varchar"},
+    )
+    assert left_table().join(right, "k").num_rows == 0
+    assert left_table().join(right, "k", how="left").num_rows == 3
+
+
+def test_suffixes():
+    right = DictOfListsTable(
+        {"k": [1], "a": ["p"]}, column_types={"k": "integer", "a": "varchar"}
+    )
+    joined = left_table().join(right, "k")
+    assert joined.headers == ["k", "a_left", "a_right"]
+
+
+def test_suffixed_name_collision_raises():
+    left = DictOfListsTable({"k": [1], "a": ["x"], "a_right": ["y"]})
+    right = DictOfListsTable({"k": [1], "a": ["p"]})
+    with pytest.raises(ValueError):
+        left.join(right, "k")
+
+
+@pytest.mark.parametrize("how", ["inner", "left", "outer"])
+def test_blank_keys_never_match(how):
+    left = DictOfListsTable({"k": ["1", "", None], "a": ["x", "y", "z"]})
+    right = DictOfListsTable({"k": ["", "1", None], "b": ["p", "q", "r"]})
+    joined = left.join(right, "k", how=how)
+    matched = [row for row in joined.to_list_of_lists() if None not in row[1:]]
+    assert matched == [[1, "x", "q"]]
+    assert joined.num_rows == {"inner": 1, "left": 3, "outer": 5}[how]
+
+
+def test_blank_in_multi_column_key_never_matches():
+    left = DictOfListsTable({"k": ["1", "1"], "j": ["a", ""], "a": ["x", "y"]})
+    right = DictOfListsTable({"k": ["1", "1"], "j": ["a", ""], "b": ["p", "q"]})
+    joined = left.join(right, ["k", "j"])
+    assert joined.to_list_of_lists() == [[1, "a", "x", "p"]]
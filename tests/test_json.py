@@ -0,0 +1,57 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from veritas import DictOfListsTable
+
+
+def table():
+    return DictOfListsTable(
+        {
+            "name": ["a", ""],
+            "amount": ["0.10", ""],
+            "day": [date(2024, 1, 2), ""],
+        },
+        column_types={"name": "varchar", "amount": "numeric", "day": "date"},
+    )
+
+
+def test_records():
+    assert json.loads(table().to_json(), parse_float=Decimal) == [
+        {"name": "a", "amount": Decimal("0.10"), "day": "2024-01-02"},
+        {"name": "", "amount": None, "day": None},
+    ]
+
+
+def test_decimals_are_bare_numbers_with_all_their_digits():
+    big = DictOfListsTable(
+        {"v": ["12345678901234567890.123456789", "0.10"]},
+        column_types={"v": "numeric"},
+    )
+    assert big.to_json(orient="arrays") == (
+        '[["v"],[12345678901234567890.123456789],[0.10]]'
+    )
+    assert big.to_json_string() == '[{"v":12345678901234567890.123456789},{"v":0.10}]'
+
+
+@pytest.mark.parametrize("orient", ["records", "arrays", "columns", "ndjson"])
+def test_orients_are_chunked_the_same(orient):
+    assert table().to_json(orient=orient, chunk_rows=1) == table().to_json(
+        orient=orient
+    )
+
+
+def test_columns():
+    assert json.loads(table().to_json(orient="columns"), parse_float=Decimal) == {
+        "name": ["a", ""],
+        "amount": [Decimal("0.10"), None],
+        "day": ["2024-01-02", None],
+    }
+
+
+@pytest.mark.parametrize("chunk_rows", [0, -5])
+def test_rejects_empty_chunks(chunk_rows):
+    with pytest.raises(ValueError):
+        table().to_json(chunk_rows=chunk_rows)
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from veritas import DictOfListsTable, avg_aggr, count_aggr, max_aggr
+
+
+def sales():
+    return DictOfListsTable(
+        {
+            "region": ["n", "s", "n", "s", ""],
+            "year": ["2023", "2023", "2024", "2024", "2024"],
+            "v": ["1", "2", "3", "", "5"],
+            "w": ["10", "20", "30", "40", "50"],
+        },
+        column_types={
+            "region": "varchar",
+            "year": "integer",
+            "v": "integer",
+            "w": "integer",
+        },
+    )
+
+
+def test_rows_pivot_skips_blank_values():
+    pivoted = sales().pivot(rows="region", values=["v"])
+    assert pivoted.to_list_of_lists() == [["n", 4], ["s", 2], [None, 5]]
+    averaged = sales().pivot(rows="region", values=["v"], aggr_funcs=avg_aggr)
+    assert averaged["v"].cells == [Decimal(2), Decimal(2), Decimal(5)]
+
+
+def test_blank_keys_sort_after_typed_keys():
+    table = DictOfListsTable(
+        {"k": ["2", "", "1", None], "v": ["1", "1", "1", "1"]},
+        column_types={"k": "integer", "v": "integer"},
+    )
+    pivoted = table.pivot(rows="k", values=["v"])
+    assert pivoted.to_list_of_lists() == [[1, 1], [2, 1], [None, 2]]
+
+
+def test_columns_only_pivot():
+    pivoted = sales().pivot(columns="year", values=["w"])
+    assert pivoted.headers == ["2023", "2024"]
+    assert pivoted.to_list_of_lists() == [[30, 120]]
+
+
+def test_multiple_values_with_columns():
+    pivoted = sales().pivot(rows="region", columns="year", values=["v", "w"])
+    assert pivoted.headers == ["region", "2023 v", "2023 w", "2024 v", "2024 w"]
+    assert pivoted.to_list_of_lists() == [
+        ["n", 1, 10, 3, 30],
+        ["s", 2, 20, None, 40],
+        [None, None, None, 5, 50],
+    ]
+
+
+def test_per_value_aggr_funcs_on_the_same_column():
+    pivoted = sales().pivot(
+        rows="region", values=["v", "v"], aggr_funcs=[max_aggr, count_aggr]
+    )
+    assert pivoted.headers == ["region", "v", "v_2"]
+    assert pivoted.column_types["v_2"] == "integer"
+    assert pivoted.to_list_of_lists() == [["n", 3, 2], ["s", 2, 1], [None, 5, 1]]
+
+
+def test_margins():
+    pivoted = sales().pivot(rows="region", columns="year", values=["w"], margins=True)
+    assert pivoted.headers == ["region", "2023", "2024", "Total"]
+    assert pivoted.to_list_of_lists() == [
+        ["n", 10, 30, 40],
+        ["s", 20, 40, 60],
+        [None, None, 50, 50],
+        ["Total", 30, 120, 150],
+    ]
@@ -0,0 +1,34 @@
+import locale
+from decimal import Decimal
+
+from veritas import DictOfListsTable, Settings
+
+
+def table(settings):
+    return DictOfListsTable(
+        {"n": [1234567], "d": [Decimal("1234.5")], "m": [Decimal("1234.5")]},
+        column_types={"n": "integer", "d": "numeric", "m": "money"},
+        settings=settings,
+    )
+
+
+def test_default_format():
+    assert (
+        table(Settings()).to_csv(header=False) == '"1,234,567","1,234.5","$1,234.50"\n'
+    )
+
+
+def test_explicit_separators():
+    settings = Settings(thousands_separator=".", decimal_point=",", currency_symbol="€")
+    assert table(settings).to_csv(header=False) == '1.234.567,"1.234,5","€1.234,50"\n'
+
+
+def test_from_conventions_leaves_the_process_locale_alone():
+    before = locale.setlocale(locale.LC_NUMERIC)
+    settings = Settings.from_conventions(
+        {"thousands_sep": " ", "decimal_point": ",", "currency_symbol": "kr"},
+        int_comma=False,
+    )
+    assert locale.setlocale(locale.LC_NUMERIC) == before
+    assert settings.format_options.decimal_point == ","
+    assert not settings.int_comma
@@ -0,0 +1,57 @@
+import pytest
+
+from veritas import ASC, DESC, DictOfListsTable
+
+
+def table():
+    return DictOfListsTable(
+        {"g": ["b", "a", "b", "a"], "n": ["3", "", "1", "2"]},
+        column_types={"g": "varchar", "n": "integer"},
+    )
+
+
+def test_blanks_sort_with_nulls():
+    single = DictOfListsTable({"n": ["3", "", "1"]}, column_types={"n": "integer"})
+    single.sort("n")
+    assert single.to_list_of_lists() == [[1], [3], [""]]
+    single.sort("n", reverse=True)
+    assert single.to_list_of_lists() == [[3], [1], [""]]
+
+
+def test_nulls_first():
+    single = DictOfListsTable({"n": ["3", "", "1"]}, column_types={"n": "integer"})
+    single.sort("n", nulls="first")
+    assert single.to_list_of_lists() == [[""], [1], [3]]
+
+
+def test_none_and_blank_are_both_nulls():
+    single = DictOfListsTable({"n": [2, None, "", 1]}, column_types={"n": "integer"})
+    single.sort(by=[("n", DESC)], nulls="first")
+    assert single["n"].cells[2:] == [2, 1]
+
+
+def test_sort_by_several_columns():
+    sorted_table = table()
+    sorted_table.sort(by=["g", "n"])
+    assert sorted_table.to_list_of_lists() == [["a", 2], ["a", ""], ["b", 1], ["b", 3]]
+
+
+def test_mixed_directions():
+    sorted_table = table()
+    sorted_table.sort(by=[("g", DESC), ("n", ASC)], nulls="first")
+    assert sorted_table.to_list_of_lists() == [["b", 1], ["b", 3], ["a", ""], ["a", 2]]
+
+
+def test_sort_with_key():
+    sorted_table = table()
+    sorted_table.sort(by=[("g", ASC, {"a": 1, "b": 0}), ("n", DESC)])
+    assert sorted_table.to_list_of_lists() == [["b", 3], ["b", 1], ["a", 2], ["a", ""]]
+
+
+def test_bad_arguments_raise():
+    with pytest.raises(ValueError):
+        table().sort("n", nulls="middle")
+    with pytest.raises(ValueError):
+        table().sort(by=[("n", "up")])
+    with pytest.raises(AttributeError):
+        table().sort(by=["missing"])
@@ -0,0 +1,95 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from veritas import DictOfListsTable, Settings
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+
+@pytest.fixture
+def engine():
+    return sqlalchemy.create_engine("sqlite://")
+
+
+def table(settings=None):
+    return DictOfListsTable(
+        {
+            "id": ["1", "2", "3"],
+            "amount": ["1.25", "", "3.50"],
+            "name": ["a", "b", "c"],
+            "day": ["2024-01-02", "2024-01-03", ""],
+        },
+        column_types={
+            "id": "integer",
+            "amount": "numeric",
+            "name": "varchar",
+            "day": "date",
+        },
+        settings=settings,
+    )
+
+
+def fetch(engine, query="SELECT id, amount, name, day FROM t ORDER BY id"):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.exec_driver_sql(query)]
+
+
+def test_creates_typed_table(engine):
+    table().to_sql(engine, "t", batch_size=2)
+    columns = {
+        column["name"]: type(column["type"])
+        for column in sqlalchemy.inspect(engine).get_columns("t")
+    }
+    assert columns == {
+        "id": sqlalchemy.INTEGER,
+        "amount": sqlalchemy.NUMERIC,
+        "name": sqlalchemy.TEXT,
+        "day": sqlalchemy.DATE,
+    }
+    assert fetch(engine) == [
+        (1, 1.25, "a", "2024-01-02"),
+        (2, None, "b", "2024-01-03"),
+        (3, 3.5, "c", None),
+    ]
+
+
+def test_typed_columns(engine):
+    table(Settings(typed_columns=True)).to_sql(engine, "t")
+    assert fetch(engine, "SELECT id FROM t ORDER BY id") == [(1,), (2,), (3,)]
+
+
+def test_fail(engine):
+    table().to_sql(engine, "t")
+    with pytest.raises(ValueError):
+        table().to_sql(engine, "t")
+    assert len(fetch(engine)) == 3
+
+
+def test_append(engine):
+    table().to_sql(engine, "t")
+    table().to_sql(engine, "t", if_exists="append")
+    assert len(fetch(engine)) == 6
+
+
+def test_replace(engine):
+    table().to_sql(engine, "t")
+    DictOfListsTable(
+        {"id": [9], "amount": [Decimal("9")], "name": ["z"], "day": [date(2024, 2, 1)]}
+    ).to_sql(engine, "t", if_exists="replace")
+    assert fetch(engine) == [(9, 9, "z", "2024-02-01")]
+
+
+def test_connection_in_transaction_is_left_to_the_caller(engine):
+    table().to_sql(engine, "t")
+    with engine.connect() as conn:
+        conn.begin()
+        table().to_sql(conn, "t", if_exists="append")
+        conn.rollback()
+    assert len(fetch(engine)) == 3
+
+
+def test_rejects_unknown_if_exists(engine):
+    with pytest.raises(ValueError):
+        table().to_sql(engine, "t", if_exists="merge")
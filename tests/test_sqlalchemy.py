@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from veritas import Settings, SqlAlcTable, TypedColumn
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+
+@pytest.fixture
+def engine():
+    engine = sqlalchemy.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE t (id INTEGER, amount NUMERIC, name TEXT, day DATE)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO t VALUES (?, ?, ?, ?)",
+            [(x, f"{x}.5", f"n{x}", f"2024-01-{x:02}") for x in range(1, 8)],
+        )
+    return engine
+
+
+def select(engine):
+    conn = engine.connect()
+    metadata = sqlalchemy.MetaData()
+    t = sqlalchemy.Table("t", metadata, autoload_with=conn)
+    return conn, conn.execute(sqlalchemy.select(t).order_by(t.c.id))
+
+
+def test_batched_read(engine):
+    conn, result = select(engine)
+    with conn:
+        table = SqlAlcTable(result, batch_size=3)
+    assert table.num_rows == 7
+    assert table.headers == ["id", "amount", "name", "day"]
+    assert table.column_types["id"] == "integer"
+    assert table.to_list_of_lists()[-1] == [7, Decimal("7.5"), "n7", date(2024, 1, 7)]
+
+
+def test_batched_read_into_typed_columns(engine):
+    conn, result = select(engine)
+    with conn:
+        table = SqlAlcTable(result, settings=Settings(typed_columns=True), batch_size=2)
+    assert isinstance(table._table_data["id"], TypedColumn)
+    assert list(table._table_data["id"]) == list(range(1, 8))
+    assert table["amount"].sum() == Decimal("31.5")
+
+
+def test_stream(engine):
+    conn, result = select(engine)
+    with conn:
+        chunks = list(SqlAlcTable.stream(result, batch_size=3))
+    assert [chunk.num_rows for chunk in chunks] == [3, 3, 1]
+    assert chunks[1].to_list_of_lists()[0][:3] == [4, Decimal("4.5"), "n4"]
+
+
+def test_list_of_rows(engine):
+    conn, result = select(engine)
+    with conn:
+        table = SqlAlcTable(result.fetchall())
+    assert table.num_rows == 7
+    assert table.to_list_of_lists()[0][:3] == [1, Decimal("1.5"), "n1"]
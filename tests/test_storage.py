@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+from veritas import DictOfListsTable, Settings, TypedColumn
+
+
+def typed_table(data):
+    return DictOfListsTable(data, settings=Settings(typed_columns=True))
+
+
+def test_integer_column_is_typed():
+    table = typed_table({"n": ["1", "2", ""]})
+    column = table._table_data["n"]
+    assert isinstance(column, TypedColumn)
+    assert list(column) == [1, 2, None]
+    assert column.null_count == 1
+    assert table["n"].sum() == 3
+
+
+def test_numeric_column_keeps_decimals():
+    table = typed_table({"v": ["0.1", "0.2"]})
+    assert not isinstance(table._table_data["v"], TypedColumn)
+    assert table["v"].sum() == Decimal("0.3")
+    assert table.to_list_of_lists() == [[Decimal("0.1")], [Decimal("0.2")]]
+
+
+def test_only_integer_seconds_and_bool_are_compact():
+    table = typed_table({"n": ["1"], "b": ["True"], "d": ["2024-01-02"]})
+    assert isinstance(table._table_data["n"], TypedColumn)
+    assert isinstance(table._table_data["b"], TypedColumn)
+    assert not isinstance(table._table_data["d"], TypedColumn)
+    assert TypedColumn("seconds", [90, None]).typecode == "q"
+
+
+def test_set_and_take():
+    column = TypedColumn("integer", [1, 2, 3])
+    column[1] = None
+    column[2] = "4,000"
+    assert list(column) == [1, None, 4000]
+    assert list(column.take([2, 0])) == [4000, 1]
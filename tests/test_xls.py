@@ -0,0 +1,71 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pytest
+
+from veritas import XlsTable
+
+xlrd = pytest.importorskip("xlrd")
+
+EMPTY, TEXT, NUMBER, DATE, BOOL = 0, 1, 2, 3, 4
+
+
+@pytest.mark.parametrize(
+    "values, types, column_type",
+    [
+        ([1.0, 2.0, ""], [NUMBER, NUMBER, EMPTY], "integer"),
+        ([1.0, 2.5], [NUMBER, NUMBER], "numeric"),
+        ([3.0, "x"], [NUMBER, TEXT], "varchar"),
+        ([45293.0, 45294.0], [DATE, DATE], "date"),
+        ([45293.0, 45294.5], [DATE, DATE], "timestamp"),
+        ([0.5, 0.25], [DATE, DATE], "time"),
+        ([1, 0], [BOOL, BOOL], "bool"),
+        (["", ""], [EMPTY, EMPTY], "varchar"),
+    ],
+)
+def test_guess_xls_type(values, types, column_type):
+    assert XlsTable._guess_xls_type(values, types, 0) == column_type
+
+
+def test_convert_numbers():
+    types = [NUMBER, NUMBER, EMPTY]
+    assert XlsTable._convert_xls([3.0, 4.0, ""], types, "integer", 0) == [3, 4, None]
+    assert XlsTable._convert_xls([3.0, 0.1, ""], types, "numeric", 0) == [
+        Decimal(3),
+        Decimal("0.1"),
+        None,
+    ]
+
+
+def test_convert_numbers_in_a_text_column():
+    converted = XlsTable._convert_xls(
+        [3.0, 2.5, "x", 1], [NUMBER, NUMBER, TEXT, BOOL], "varchar", 0
+    )
+    assert converted == ["3", "2.5", "x", "True"]
+
+
+def test_convert_dates():
+    values = [45293.0, 45293.5]
+    assert XlsTable._convert_xls(values, [DATE, DATE], "date", 0) == [
+        date(2024, 1, 2),
+        date(2024, 1, 2),
+    ]
+    assert XlsTable._convert_xls(values, [DATE, DATE], "timestamp", 0) == [
+        datetime(2024, 1, 2),
+        datetime(2024, 1, 2, 12),
+    ]
+    assert XlsTable._convert_xls([0.5], [DATE], "time", 0) == [time(12)]
+
+
+def test_read_workbook(tmp_path):
+    xlwt = pytest.importorskip("xlwt")
+    book = xlwt.Workbook()
+    sheet = book.add_sheet("data")
+    for y, row in enumerate([["n", "mixed"], [1, 3], [2, "x"], [-3, 2.5]]):
+        for x, value in enumerate(row):
+            sheet.write(y, x, value)
+    path = tmp_path / "in.xls"
+    book.save(str(path))
+    table = XlsTable(path)
+    assert table.column_types == {"n": "integer", "mixed": "varchar"}
+    assert table.to_list_of_lists() == [[1, "3"], [2, "x"], [-3, "2.5"]]
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+import pytest
+
+from veritas import LxmlTable
+
+pytest.importorskip("lxml")
+
+ROWS = """<?xml version="1.0"?>
+<data>
+  <row><id>1</id><price>1.5</price><ok>true</ok></row>
+  <row><id>2</id><price>2</price><ok>false</ok><note>x</note></row>
+  <row><id>3</id><ok>true</ok></row>
+</data>
+"""
+
+
+def write(tmp_path, text):
+    path = tmp_path / "in.xml"
+    path.write_text(text)
+    return path
+
+
+def test_from_file(tmp_path):
+    table = LxmlTable.from_file(write(tmp_path, ROWS))
+    assert table.headers == ["id", "price", "ok", "note"]
+    assert table.column_types == {
+        "id": "integer",
+        "price": "numeric",
+        "ok": "bool",
+        "note": "varchar",
+    }
+    assert table.to_list_of_lists() == [
+        [1, Decimal("1.5"), True, ""],
+        [2, Decimal("2"), False, "x"],
+        [3, "", True, ""],
+    ]
+
+
+def test_row_tag(tmp_path):
+    text = "<data><meta><a>x</a></meta><r><a>1</a></r><r><a>2</a></r></data>"
+    table = LxmlTable.from_file(write(tmp_path, text), row_tag="r")
+    assert table.to_list_of_lists() == [[1], [2]]
+
+
+def test_pyval(tmp_path):
+    table = LxmlTable.from_file(write(tmp_path, ROWS), pyval=True)
+    assert table["id"].cells == [1, 2, 3]
+    assert table["ok"].cells == [True, False, True]
+
+
+@pytest.mark.parametrize("pyval", [False, True])
+def test_types_widen_past_the_sample(tmp_path, pyval):
+    rows = "".join(f"<r><v>{x}</v></r>" for x in range(5)) + "<r><v>n/a</v></r>"
+    table = LxmlTable.from_file(
+        write(tmp_path, f"<data>{rows}</data>"), pyval=pyval, sample_rows=5
+    )
+    assert table.column_types == {"v": "integer"}
+    assert table.to_list_of_lists()[-2:] == [["4"], ["n/a"]]
+    assert table.column_types == {"v": "varchar"}
@@ -1,6 +1,9 @@
 from .settings import Settings
+from .aggregate import Aggregator, register_aggregator
+from .storage import TypedColumn
 from .tables import (
     CsvTable,
+    DictOfListsTable,
     ExcelTable,
     HtmlTable,
     ListOfDictsTable,
@@ -8,8 +11,11 @@ from .tables import (
     SqlAlcTable,
     LxmlTable,
     Table,
+    XlsTable,
 )
 from .util import (
+    ASC,
+    DESC,
     avg_aggr,
     count_aggr,
     get_sql_query_types,
@@ -0,0 +1,307 @@
+from itertools import repeat
+
+from . import tables
+from .util import is_null
+
+
+def _identity(state):
+    return state
+
+
+class Aggregator(object):
+    """Describes an aggregate as four functions so partial results computed
+    on separate chunks or processes can be combined:
+
+    init() returns a fresh state, update(state, value) folds a non-null value
+    into a state and returns it, merge(state, other) combines two states and
+    finalize(state) turns a state into the resulting value. 'column_type' is
+    the type of the result, None meaning the type of the aggregated column.
+
+    Registered aggregators are pickled by name, others by their functions,
+    which then have to be picklable themselves."""
+
+    __slots__ = ("name", "init", "update", "merge", "finalize", "column_type")
+
+    def __init__(
+        self,
+        name,
+        init,
+        update,
+        merge,
+        finalize=None,
+        column_type=None,
+    ):
+        self.name = name
+        self.init = init
+        self.update = update
+        self.merge = merge
+        self.finalize = finalize or _identity
+        self.column_type = column_type
+
+    def __reduce__(self):
+        # grouped states are sent between processes and merged there, the
+        # built in aggregators hold lambdas so they're looked up by name
+        if AGGREGATORS.get(self.name) is self:
+            return get_aggregator, (self.name,)
+        return type(self), (
+            self.name,
+            self.init,
+            self.update,
+            self.merge,
+            self.finalize,
+            self.column_type,
+        )
+
+    def __repr__(self):
+        return f"<{type(self).__name__}({self.name})>"
+
+
+def _first_not_none(state, other):
+    return state if state is not None else other
+
+
+def _combine(func):
+    def combine(state, other):
+        if state is None:
+            return other
+        if other is None:
+            return state
+        return func(state, other)
+
+    return combine
+
+
+def _update_set(state, value):
+    state.add(value)
+    return state
+
+
+def _merge_sets(state, other):
+    state.update(other)
+    return state
+
+
+def _avg(state):
+    total, n = state
+    if n:
+        return total / n
+
+
+AGGREGATORS = {}
+
+
+def register_aggregator(aggregator):
+    AGGREGATORS[aggregator.name] = aggregator
+    return aggregator
+
+
+register_aggregator(
+    Aggregator(
+        "sum",
+        lambda: None,
+        _combine(lambda state, value: state + value),
+        _combine(lambda state, other: state + other),
+    )
+)
+register_aggregator(
+    Aggregator(
+        "count",
+        lambda: 0,
+        lambda state, _: state + 1,
+        lambda state, other: state + other,
+        column_type="integer",
+    )
+)
+register_aggregator(Aggregator("min", lambda: None, _combine(min), _combine(min)))
+register_aggregator(Aggregator("max", lambda: None, _combine(max), _combine(max)))
+register_aggregator(
+    Aggregator(
+        "avg",
+        lambda: (0, 0),
+        lambda state, value: (state[0] + value, state[1] + 1),
+        lambda state, other: (state[0] + other[0], state[1] + other[1]),
+        _avg,
+        column_type="numeric",
+    )
+)
+AGGREGATORS["mean"] = AGGREGATORS["avg"]
+register_aggregator(
+    Aggregator(
+        "product",
+        lambda: None,
+        _combine(lambda state, value: state * value),
+        _combine(lambda state, other: state * other),
+    )
+)
+register_aggregator(
+    Aggregator(
+        "first",
+        lambda: None,
+        _first_not_none,
+        _first_not_none,
+    )
+)
+register_aggregator(
+    Aggregator(
+        "last",
+        lambda: None,
+        lambda state, value: value,
+        lambda state, other: other if other is not None else state,
+    )
+)
+register_aggregator(
+    Aggregator(
+        "count_distinct",
+        set,
+        _update_set,
+        _merge_sets,
+        len,
+        column_type="integer",
+    )
+)
+
+
+def get_aggregator(aggregator):
+    if isinstance(aggregator, Aggregator):
+        return aggregator
+    try:
+        return AGGREGATORS[str(aggregator).lower()]
+    except KeyError:
+        raise ValueError(f"{aggregator} is not a known aggregate") from None
+
+
+class GroupBy(object):
+    """Returned by Table.group_by(). Call agg() with one keyword per output
+    column, each set to a (column, aggregate) pair where aggregate is the name
+    of a registered aggregate or an Aggregator. A column of None counts rows,
+    otherwise None and blank values are skipped.
+
+        table.group_by("region").agg(total=("amount", "sum"), n=(None, "count"))
+    """
+
+    __slots__ = ("table", "keys")
+
+    def __init__(self, table, keys):
+        for key in keys:
+            if not table._has_column(key):
+                raise AttributeError(f"{table} does not have column {key}")
+        self.table = table
+        self.keys = list(keys)
+
+    def agg(self, **aggregations):
+        return self.partial(**aggregations).to_table()
+
+    def partial(self, **aggregations):
+        """Computes the aggregate states without finalizing them so they can
+        be merged with the states of other chunks before building a table"""
+        table = self.table
+        specs = []
+        for name, (column, aggregator) in aggregations.items():
+            if column is not None and not table._has_column(column):
+                raise AttributeError(f"{table} does not have column {column}")
+            aggregator = get_aggregator(aggregator)
+            column_type = aggregator.column_type
+            if column_type is None:
+                column_type = table.column_types.get(column)
+            specs.append((name, column, aggregator, column_type))
+        num_rows = table.num_rows
+        if self.keys:
+            keys = zip(*[table._iter_cleaned(key, True) for key in self.keys])
+        else:
+            keys = repeat((), num_rows)
+        if specs:
+            values = zip(
+                *[
+                    (
+                        table._iter_cleaned(column)
+                        if column is not None
+                        else repeat(True, num_rows)
+                    )
+                    for _, column, _, _ in specs
+                ]
+            )
+        else:
+            values = repeat((), num_rows)
+        updates = [
+            (x, aggregator.update) for x, (_, _, aggregator, _) in enumerate(specs)
+        ]
+        inits = [aggregator.init for _, _, aggregator, _ in specs]
+        groups = {}
+        for key, vals in zip(keys, values):
+            states = groups.get(key)
+            if states is None:
+                states = groups[key] = [init() for init in inits]
+            for x, update in updates:
+                value = vals[x]
+                if not is_null(value):
+                    states[x] = update(states[x], value)
+        return GroupedStates(
+            self.keys,
+            {key: table.column_types.get(key) for key in self.keys},
+            specs,
+            groups,
+            table.name,
+            table._settings,
+        )
+
+
+class GroupedStates(object):
+    """The unfinalized result of GroupBy.partial(). States from other chunks
+    grouped the same way can be folded in with merge() before calling
+    to_table()."""
+
+    __slots__ = ("keys", "key_types", "specs", "groups", "name", "settings")
+
+    def __init__(self, keys, key_types, specs, groups, name=None, settings=None):
+        self.keys = keys
+        self.key_types = key_types
+        self.specs = specs
+        self.groups = groups
+        self.name = name
+        self.settings = settings
+
+    def _signature(self):
+        return (
+            self.keys,
+            [(name, column, agg.name) for name, column, agg, _ in self.specs],
+        )
+
+    def merge(self, other):
+        if self._signature() != other._signature():
+            raise ValueError(
+                "can only merge states grouped and aggregated the same way"
+            )
+        merges = [
+            (x, aggregator.merge) for x, (_, _, aggregator, _) in enumerate(self.specs)
+        ]
+        for key, other_states in other.groups.items():
+            states = self.groups.get(key)
+            if states is None:
+                self.groups[key] = other_states
+            else:
+                for x, merge in merges:
+                    states[x] = merge(states[x], other_states[x])
+        return self
+
+    def to_table(self):
+        headers = list(self.keys)
+        column_types = dict(self.key_types)
+        columns = {}
+        group_keys = list(self.groups.keys())
+        group_states = list(self.groups.values())
+        for x, key in enumerate(self.keys):
+            columns[key] = [group_key[x] for group_key in group_keys]
+        for x, (name, _, aggregator, column_type) in enumerate(self.specs):
+            if name in columns:
+                raise ValueError(f"{name} is both a key and an aggregate column")
+            headers.append(name)
+            column_types[name] = column_type
+            columns[name] = [aggregator.finalize(states[x]) for states in group_states]
+        return tables.DictOfListsTable(
+            columns,
+            headers,
+            None,
+            column_types,
+            self.name,
+            self.settings,
+        )
@@ -1,10 +1,7 @@
-import locale
 from decimal import InvalidOperation
 
 from . import Settings, col, row, tables
-from .util import cast, clean_value, format_value
-
-locale.setlocale(locale.LC_ALL, "")
+from .util import cast, compile_converter, format_value
 
 
 class Cell(object):
@@ -17,6 +14,7 @@ class Cell(object):
         "column_type",
         "_parent",
         "_settings",
+        "_converter",
         "_i",
     )
 
@@ -29,6 +27,7 @@ class Cell(object):
         parent=None,
         settings=None,
         column_type=None,
+        converter=None,
     ):
         self.header = header
         self.row_num = row_num
@@ -44,10 +43,13 @@ class Cell(object):
         else:
             self.column_type = column_type
         self._settings = settings or Settings()
+        self._converter = converter or compile_converter(
+            self.column_type, self._settings
+        )
         try:
-            self._value = clean_value(value, self.column_type, settings)
+            self._value = self._converter(value)
             self._raw_value = value
-        except (TypeError, InvalidOperation):
+        except (TypeError, ValueError, InvalidOperation):
             self._value = value
         self._i = 0
 
@@ -57,8 +59,15 @@ class Cell(object):
 
     @value.setter
     def value(self, new_val):
+        if self._parent:
+            if isinstance(self._parent, row.Row):
+                self._parent[self.header] = new_val
+            elif isinstance(self._parent, col.Col):
+                self._parent[self.row_num] = new_val
+            elif isinstance(self._parent, tables.BaseTable):
+                self._parent[self.header][self.row_num] = new_val
         self._raw_value = new_val
-        self._value = clean_value(new_val, self.column_type, self._settings)
+        self._value = self._converter(new_val)
 
     @property
     def raw_value(self):
@@ -93,17 +102,6 @@ class Cell(object):
                 cell_type,
             )
 
-    def __setattr__(self, key, value):
-        if key == "value":
-            if self._parent:
-                if isinstance(self._parent, row.Row):
-                    self._parent[self.header] = value
-                elif isinstance(self._parent, col.Col):
-                    self._parent[self.row_num] = value
-                elif isinstance(self._parent, tables.BaseTable):
-                    self._parent[self.header][self.row_num] = value
-        object.__setattr__(self, key, value)
-
     def __eq__(self, other):
         if isinstance(other, Cell):
             return self.value == other.value
@@ -387,7 +385,10 @@ class Cell(object):
             return str(self._value)
         else:
             return format_value(
-                self._value, self.column_type, self._settings.datetime_format
+                self._value,
+                self.column_type,
+                self._settings.datetime_format,
+                self._settings.format_options,
             )
 
     def getquoted(self):
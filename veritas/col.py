@@ -2,6 +2,7 @@ from decimal import Decimal
 
 from . import Settings
 from . import cell as cell_module
+from .storage import TypedColumn
 
 
 class Col(object):
@@ -13,10 +14,18 @@ class Col(object):
         "_parent",
         "_i",
         "_settings",
+        "_converter",
     )
 
     def __init__(
-        self, cells, column_type, header, col_num, parent, settings=None
+        self,
+        cells,
+        column_type,
+        header,
+        col_num,
+        parent,
+        settings=None,
+        converter=None,
     ):
         self.cells = cells
         self.column_type = column_type
@@ -24,9 +33,15 @@ class Col(object):
         self.col_num = col_num
         self._parent = parent
         self._settings = settings or Settings()
+        self._converter = converter
         self._i = 0
 
     def index(self, item):
+        if self._parent is not None and self.header in self._parent._indexes:
+            positions = self._parent.lookup(self.header, item)
+            if not positions:
+                raise ValueError(f"{item} is not in column {self.header}")
+            return positions[0]
         return self.cells.index(item)
 
     def to_list(self):
@@ -45,6 +60,8 @@ class Col(object):
             return False
 
     def sum(self):
+        if isinstance(self.cells, TypedColumn):
+            return Decimal(str(self.cells.sum()))
         return sum(
             [
                 Decimal(str(cell).replace(",", ""))
@@ -56,12 +73,24 @@ class Col(object):
     def replace(self, old, new):
         for x, cell in enumerate(self.cells):
             self.cells[x] = cell_module.Cell(
-                cell, self.header, x, self.col_num, self, self._settings
+                cell,
+                self.header,
+                x,
+                self.col_num,
+                self,
+                self._settings,
+                converter=self._converter,
             ).replace(old, new)
 
     def get_cell(self, x):
         return cell_module.Cell(
-            self.cells[x], self.header, x, self.col_num, self, self._settings
+            self.cells[x],
+            self.header,
+            x,
+            self.col_num,
+            self,
+            self._settings,
+            converter=self._converter,
         )
 
     def to_html(self, add_attr=None, row_total=False):
@@ -98,9 +127,12 @@ class Col(object):
             value = value.value
         if isinstance(key, int):
             if key < len(self.cells):
-                self.cells[key] = value
                 if self._parent:
-                    self._parent.change_cell(self.header, key, value)
+                    # the cells are the parent's own column, which has to see
+                    # the old value to keep its index up to date
+                    self._parent.change_cell(key, self.header, value)
+                else:
+                    self.cells[key] = value
             else:
                 raise IndexError("assignment index out of range")
         else:
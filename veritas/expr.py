@@ -0,0 +1,189 @@
+import operator
+from itertools import repeat
+
+from .storage import TypedColumn
+from .util import is_null
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# translation table that swaps the 0 and 1 bytes of a mask
+_INVERT = bytes([1, 0]) + bytes(254)
+
+
+class Mask(object):
+    """One byte per row, 1 where the row is selected. Masks are combined with
+    &, | and ~ and handed to Table.where(). The bytes are combined as big
+    integers so combining masks never loops over the rows in Python."""
+
+    __slots__ = "bits"
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    @classmethod
+    def from_positions(cls, positions, length):
+        bits = bytearray(length)
+        for x in positions:
+            bits[x] = 1
+        return cls(bits)
+
+    def _combine(self, other, op):
+        if not isinstance(other, Mask):
+            return NotImplemented
+        if len(self.bits) != len(other.bits):
+            raise ValueError("can only combine masks of the same length")
+        bits = op(
+            int.from_bytes(self.bits, "little"), int.from_bytes(other.bits, "little")
+        )
+        return Mask(bytearray(bits.to_bytes(len(self.bits), "little")))
+
+    def __and__(self, other):
+        return self._combine(other, operator.and_)
+
+    def __or__(self, other):
+        return self._combine(other, operator.or_)
+
+    def __xor__(self, other):
+        return self._combine(other, operator.xor)
+
+    def __invert__(self):
+        return Mask(self.bits.translate(_INVERT))
+
+    def count(self):
+        return self.bits.count(1)
+
+    def __bool__(self):
+        raise TypeError("a mask has no truth value, combine masks with & | and ~")
+
+    def __iter__(self):
+        return iter(self.bits)
+
+    def __len__(self):
+        return len(self.bits)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} Selected: {self.count()} of {len(self)}>"
+
+
+class ColumnRef(object):
+    """A column of a table in an expression. Comparing it to a value gives a
+    Mask computed a column at a time. Values are compared once cleaned and
+    nulls, None or a blank string, never match a comparison, use isnull() to
+    select them."""
+
+    __slots__ = ("table", "column")
+
+    def __init__(self, table, column):
+        if not table._has_column(column):
+            raise AttributeError(f"{table} does not have column {column}")
+        self.table = table
+        self.column = column
+
+    def _values(self, memoize=False):
+        column = self.table._table_data[self.column]
+        if isinstance(column, TypedColumn):
+            return column
+        return list(self.table._iter_cleaned(self.column, memoize))
+
+    def _indexed(self, value):
+        if self.column in self.table._indexes:
+            return Mask.from_positions(
+                self.table.lookup(self.column, value), self.table.num_rows
+            )
+
+    def compare(self, condition, value):
+        """Compares the column to 'value' with one of ==, !=, <, <=, > or >="""
+        if condition not in OPERATORS:
+            raise SyntaxError(f"{condition} is not a comparison")
+        value = self.table._clean_value(self.column, value)
+        if is_null(value):
+            if condition == "==":
+                return self.isnull()
+            if condition == "!=":
+                return self.notnull()
+            raise TypeError(f"can't compare {self.column} {condition} None")
+        if condition == "==":
+            mask = self._indexed(value)
+            if mask is not None:
+                return mask
+        op = OPERATORS[condition]
+        values = self._values(condition in ("==", "!="))
+        if isinstance(values, TypedColumn):
+            has_nulls = values.null_count > 0
+        else:
+            has_nulls = None in values or "" in values
+        if has_nulls and condition != "==":
+            return Mask(
+                bytearray(not is_null(item) and op(item, value) for item in values)
+            )
+        return Mask(bytearray(map(op, values, repeat(value))))
+
+    def isin(self, values):
+        clean = self.table._clean_value
+        values = {clean(self.column, value) for value in values}
+        values.discard(None)
+        values.discard("")
+        if self.column in self.table._indexes:
+            positions = []
+            for value in values:
+                positions.extend(self.table.lookup(self.column, value))
+            return Mask.from_positions(positions, self.table.num_rows)
+        return Mask(bytearray(map(values.__contains__, self._values(True))))
+
+    def between(self, low, high):
+        return (self >= low) & (self <= high)
+
+    def isnull(self):
+        values = self._values()
+        if isinstance(values, TypedColumn):
+            return Mask(bytearray(map(operator.is_, values, repeat(None))))
+        return Mask(bytearray(map(is_null, values)))
+
+    def notnull(self):
+        return ~self.isnull()
+
+    def __eq__(self, other):
+        return self.compare("==", other)
+
+    def __ne__(self, other):
+        return self.compare("!=", other)
+
+    def __lt__(self, other):
+        return self.compare("<", other)
+
+    def __le__(self, other):
+        return self.compare("<=", other)
+
+    def __gt__(self, other):
+        return self.compare(">", other)
+
+    def __ge__(self, other):
+        return self.compare(">=", other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__}({self.column})>"
+
+
+class Columns(object):
+    """Returned by Table.c, gives a ColumnRef for each column either as an
+    attribute or by name"""
+
+    __slots__ = "_table"
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getattr__(self, item):
+        return ColumnRef(self._table, item)
+
+    def __getitem__(self, item):
+        return ColumnRef(self._table, item)
@@ -0,0 +1,232 @@
+from abc import ABCMeta, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+
+from .util import is_null
+
+
+class BaseIndex(metaclass=ABCMeta):
+    """Base of the column indexes. Appends, cell changes and row removals
+    update an index in place, anything else that moves rows around only marks
+    it as stale so it is rebuilt the next time it is used. Null values, None
+    or blank, are not indexed.
+
+    Rows are stored under an id that never changes while the index is alive.
+    Removing a row records its id instead of renumbering every row after it,
+    and a position is the id minus the number of removed ids before it."""
+
+    __slots__ = ("column", "unique", "stale", "_removed")
+
+    def __init__(self, column, unique=False):
+        self.column = column
+        self.unique = unique
+        self.stale = True
+        self._removed = []
+
+    def build(self, table):
+        self._removed = []
+        self._build(list(table._iter_cleaned(self.column, True)))
+        self.stale = False
+        return self
+
+    @abstractmethod
+    def _build(self, keys):
+        pass
+
+    def _to_id(self, position):
+        removed = self._removed
+        if not removed:
+            return position
+        # the smallest id with 'position' live rows before it, found by
+        # bisecting since the position only grows with the id
+        low, high = position, position + len(removed)
+        while low < high:
+            middle = (low + high) // 2
+            if middle - bisect_right(removed, middle) < position:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _to_position(self, row_id):
+        if not self._removed:
+            return row_id
+        return row_id - bisect_left(self._removed, row_id)
+
+    def check(self, key):
+        if self.unique and not is_null(key) and key in self:
+            raise ValueError(f"{self.column} already has value {key!r}")
+
+    @abstractmethod
+    def add(self, key, position):
+        pass
+
+    @abstractmethod
+    def discard(self, key, position):
+        """Takes the row at 'position' out of the entry for 'key'"""
+
+    def remove_row(self, key, position):
+        """Forgets the row at 'position', which shifts every later row up"""
+        row_id = self._to_id(position)
+        self.discard(key, position)
+        insort(self._removed, row_id)
+
+    @abstractmethod
+    def get(self, key):
+        """Returns the positions of the rows holding 'key'"""
+
+    @abstractmethod
+    def __contains__(self, key):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def __repr__(self):
+        unique = " unique" if self.unique else ""
+        return f"<{type(self).__name__}({self.column}){unique} Keys: {len(self)}>"
+
+
+class HashIndex(BaseIndex):
+    """Maps the values of a column to the rows holding them for equality
+    lookups"""
+
+    __slots__ = "_ids"
+
+    def __init__(self, column, unique=False):
+        super().__init__(column, unique)
+        self._ids = {}
+
+    def _build(self, keys):
+        ids = {}
+        for position, key in enumerate(keys):
+            if is_null(key):
+                continue
+            existing = ids.get(key)
+            if existing is None:
+                ids[key] = [position]
+            elif self.unique:
+                raise ValueError(f"{self.column} has duplicate value {key!r}")
+            else:
+                existing.append(position)
+        self._ids = ids
+
+    def add(self, key, position):
+        if is_null(key):
+            return
+        row_id = self._to_id(position)
+        ids = self._ids.get(key)
+        if ids is None:
+            self._ids[key] = [row_id]
+        else:
+            insort(ids, row_id)
+
+    def discard(self, key, position):
+        ids = self._ids.get(key)
+        if ids is None:
+            return
+        ids.remove(self._to_id(position))
+        if not ids:
+            del self._ids[key]
+
+    def get(self, key):
+        if is_null(key):
+            return []
+        return [self._to_position(row_id) for row_id in self._ids.get(key, ())]
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class SortedIndex(BaseIndex):
+    """Keeps the values of a column in sorted order next to the rows holding
+    them so equality, range lookups and min/max are answered by bisecting"""
+
+    __slots__ = ("_keys", "_ids")
+
+    def __init__(self, column, unique=False):
+        super().__init__(column, unique)
+        self._keys = []
+        self._ids = []
+
+    def _build(self, keys):
+        ids = [x for x, key in enumerate(keys) if not is_null(key)]
+        ids.sort(key=keys.__getitem__)
+        self._keys = [keys[x] for x in ids]
+        self._ids = ids
+        if self.unique:
+            for x in range(1, len(self._keys)):
+                if self._keys[x] == self._keys[x - 1]:
+                    raise ValueError(
+                        f"{self.column} has duplicate value {self._keys[x]!r}"
+                    )
+
+    def add(self, key, position):
+        if is_null(key):
+            return
+        row_id = self._to_id(position)
+        if not self._keys or self._keys[-1] <= key:
+            x = len(self._keys)
+        else:
+            x = bisect_right(self._keys, key)
+        self._keys.insert(x, key)
+        self._ids.insert(x, row_id)
+
+    def discard(self, key, position):
+        if is_null(key):
+            return
+        row_id = self._to_id(position)
+        start = bisect_left(self._keys, key)
+        end = bisect_right(self._keys, key, start)
+        for x in range(start, end):
+            if self._ids[x] == row_id:
+                del self._keys[x]
+                del self._ids[x]
+                return
+
+    def range(self, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        """Returns the positions of the rows with a value between 'low' and
+        'high' in the order of their values. A bound of None leaves that side
+        open."""
+        keys = self._keys
+        if low is None:
+            start = 0
+        elif low_inclusive:
+            start = bisect_left(keys, low)
+        else:
+            start = bisect_right(keys, low)
+        if high is None:
+            end = len(keys)
+        elif high_inclusive:
+            end = bisect_right(keys, high, start)
+        else:
+            end = bisect_left(keys, high, start)
+        return [self._to_position(row_id) for row_id in self._ids[start:end]]
+
+    def get(self, key):
+        if is_null(key):
+            return []
+        # rows changed to 'key' after the index was built are kept after the
+        # others, sorting puts them back in table order like HashIndex.get
+        return sorted(self.range(key, key))
+
+    def min(self):
+        if self._keys:
+            return self._keys[0]
+
+    def max(self):
+        if self._keys:
+            return self._keys[-1]
+
+    def __contains__(self, key):
+        x = bisect_left(self._keys, key)
+        return x < len(self._keys) and self._keys[x] == key
+
+    def __len__(self):
+        return len(self._keys)
+
+
+INDEX_KINDS = {"hash": HashIndex, "sorted": SortedIndex}
@@ -0,0 +1,200 @@
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from math import exp, floor, log
+from random import Random
+
+# how many of the first non-null values of a column are always looked at and
+# how many more are sampled from the rest of it
+HEAD_ROWS = 100
+SAMPLE_ROWS = 1000
+
+_INT32_MIN = -2147483648
+_INT32_MAX = 2147483647
+
+_DATE = r"(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2}(?:\d{2})?)"
+_TIME = r"\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:\s?[AaPp][Mm])?"
+
+_INTEGER = re.compile(r"[-+]?(?:\d+|\d{1,3}(?:,\d{3})+)")
+_NUMERIC = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+(?:\.\d*)?[eE][-+]?\d+)")
+_MONEY = re.compile(r"-?\$\s?-?(?:\d[\d,]*(?:\.\d*)?|\.\d+)")
+_PERCENT = re.compile(r"-?\d[\d,]*(?:\.\d*)?\s?%")
+_DATE_ONLY = re.compile(_DATE)
+_TIMESTAMP = re.compile(_DATE + r"[ T]" + _TIME + r"(?:Z|[-+]\d{2}:?\d{2})?")
+_TIME_ONLY = re.compile(_TIME)
+_BOOL = {"true", "false"}
+
+# types that can be widened into one another, a column holding values of two
+# types of the same chain takes the wider one and anything else is varchar
+_CHAINS = (
+    ("integer", "bigint", "numeric"),
+    ("date", "timestamp"),
+)
+_RANKS = {
+    column_type: (x, rank)
+    for x, chain in enumerate(_CHAINS)
+    for rank, column_type in enumerate(chain)
+}
+
+
+def classify(value):
+    """Returns the narrowest column type that 'value' fits, None for a null"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        if _INTEGER.fullmatch(value):
+            number = int(value.replace(",", ""))
+            if _INT32_MIN <= number <= _INT32_MAX:
+                return "integer"
+            return "bigint"
+        if _NUMERIC.fullmatch(value):
+            return "numeric"
+        if _DATE_ONLY.fullmatch(value):
+            return "date"
+        if _TIMESTAMP.fullmatch(value):
+            return "timestamp"
+        if _TIME_ONLY.fullmatch(value):
+            return "time"
+        if _MONEY.fullmatch(value):
+            return "money"
+        if _PERCENT.fullmatch(value):
+            return "percent"
+        if value.lower() in _BOOL:
+            return "bool"
+        return "varchar"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "integer" if _INT32_MIN <= value <= _INT32_MAX else "bigint"
+    if isinstance(value, (float, Decimal)):
+        return "numeric"
+    if isinstance(value, datetime):
+        return "timestamp"
+    if isinstance(value, date):
+        return "date"
+    if isinstance(value, time):
+        return "time"
+    if isinstance(value, timedelta):
+        return "interval"
+    return "varchar"
+
+
+def promote(column_type, other):
+    """Returns the type of a column holding values of both types"""
+    if column_type is None or column_type == other:
+        return other
+    if other is None:
+        return column_type
+    chain, rank = _RANKS.get(column_type, (None, 0))
+    other_chain, other_rank = _RANKS.get(other, (None, 0))
+    if chain is not None and chain == other_chain:
+        return _CHAINS[chain][max(rank, other_rank)]
+    return "varchar"
+
+
+def widest_type(values):
+    """Returns the type of a column holding all of 'values', None when every
+    one of them is null"""
+    column_type = None
+    for value in values:
+        column_type = promote(column_type, classify(value))
+        if column_type == "varchar":
+            break
+    return column_type
+
+
+def infer_type(column, head=HEAD_ROWS, sample=SAMPLE_ROWS, seed=0):
+    """Infers the type of an in memory column from its first 'head' non-null
+    values and 'sample' more values picked at random from the rest. The same
+    column always gets the same type."""
+    column_type = None
+    seen = 0
+    position = 0
+    num_rows = len(column)
+    while seen < head and position < num_rows:
+        found = classify(column[position])
+        position += 1
+        if found is not None:
+            seen += 1
+            column_type = promote(column_type, found)
+            if column_type == "varchar":
+                return column_type
+    rest = num_rows - position
+    if rest > sample:
+        positions = sorted(Random(seed).sample(range(position, num_rows), sample))
+        return promote(column_type, widest_type(column[x] for x in positions))
+    return promote(
+        column_type, widest_type(column[x] for x in range(position, num_rows))
+    )
+
+
+class ColumnSampler(object):
+    """Infers the type of a column while its values stream by. The first
+    'head' non-null values are classified as they come and a reservoir of
+    'sample' values is kept of the rest, skipping ahead between picks so most
+    values are never touched."""
+
+    __slots__ = (
+        "head",
+        "sample",
+        "column_type",
+        "_seen",
+        "_count",
+        "_reservoir",
+        "_random",
+        "_weight",
+        "_next",
+    )
+
+    def __init__(self, head=HEAD_ROWS, sample=SAMPLE_ROWS, seed=0):
+        self.head = head
+        self.sample = sample
+        self.column_type = None
+        self._seen = 0
+        self._count = 0
+        self._reservoir = []
+        self._random = Random(seed)
+        self._weight = 1.0
+        self._next = None
+
+    def extend(self, values):
+        position = 0
+        num_values = len(values)
+        while self._seen < self.head and position < num_values:
+            found = classify(values[position])
+            position += 1
+            if found is not None:
+                self._seen += 1
+                self.column_type = promote(self.column_type, found)
+        if self.column_type == "varchar":
+            return
+        reservoir = self._reservoir
+        while position < num_values and len(reservoir) < self.sample:
+            reservoir.append(values[position])
+            position += 1
+            self._count += 1
+            if len(reservoir) == self.sample:
+                self._skip()
+        # the positions to replace are worked out ahead of time so the values
+        # in between are skipped over without looking at them
+        while self._next is not None and self._next - self._count < (
+            num_values - position
+        ):
+            position += self._next - self._count
+            self._count = self._next
+            reservoir[self._random.randrange(self.sample)] = values[position]
+            position += 1
+            self._count += 1
+            self._skip()
+        self._count += num_values - position
+
+    def _skip(self):
+        random = self._random.random
+        self._weight *= exp(log(random()) / self.sample)
+        self._next = self._count + floor(log(random()) / log(1 - self._weight))
+
+    def result(self):
+        return promote(self.column_type, widest_type(self._reservoir))
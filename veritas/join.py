@@ -0,0 +1,254 @@
+from . import tables
+from .storage import TypedColumn
+from .util import MemoDict, is_null
+
+JOIN_TYPES = ("inner", "left", "right", "outer", "semi", "anti")
+
+
+def _normalize_on(on):
+    if isinstance(on, str):
+        return [on], [on]
+    if isinstance(on, dict):
+        return list(on.keys()), list(on.values())
+    left_on = []
+    right_on = []
+    for item in on:
+        if isinstance(item, str):
+            left_on.append(item)
+            right_on.append(item)
+        else:
+            left_on.append(item[0])
+            right_on.append(item[1])
+    return left_on, right_on
+
+
+def _converted(converter):
+    def convert(value):
+        try:
+            return converter(value)
+        except (TypeError, ValueError, ArithmeticError):
+            return value
+
+    return MemoDict(convert).__getitem__
+
+
+def _join_keys(table, columns, like=None, like_columns=None):
+    """Returns the cleaned keys of 'table'. With 'like' the keys of columns
+    whose type differs from the matching 'like_columns' column of the 'like'
+    table are also put through that column's converter so both sides hold
+    values of the same type."""
+    for column in columns:
+        if not table._has_column(column):
+            raise AttributeError(f"{table} does not have column {column}")
+    keys = [table._iter_cleaned(column, True) for column in columns]
+    if like is not None:
+        converters = like._get_converters()
+        for x, (column, like_column) in enumerate(zip(columns, like_columns)):
+            if table.column_types.get(column) != like.column_types.get(like_column):
+                keys[x] = map(_converted(converters[like_column]), keys[x])
+    if len(columns) == 1:
+        return list(keys[0])
+    return list(zip(*keys))
+
+
+def _is_null(key, multiple):
+    # a blank key is missing like None, so it never matches another blank
+    if multiple:
+        return any(map(is_null, key))
+    return is_null(key)
+
+
+def _is_sorted(keys, multiple):
+    try:
+        for x in range(1, len(keys)):
+            if _is_null(keys[x], multiple) or keys[x] < keys[x - 1]:
+                return False
+    except TypeError:
+        return False
+    return not keys or not _is_null(keys[0], multiple)
+
+
+def _build(keys, multiple):
+    index = {}
+    for position, key in enumerate(keys):
+        if not _is_null(key, multiple):
+            positions = index.get(key)
+            if positions is None:
+                index[key] = [position]
+            else:
+                positions.append(position)
+    return index
+
+
+def _hash_pairs(left_keys, right_keys, how, multiple):
+    build_left = how == "right" or (
+        how in ("inner", "outer") and len(left_keys) < len(right_keys)
+    )
+    if build_left:
+        build_keys, probe_keys = left_keys, right_keys
+    else:
+        build_keys, probe_keys = right_keys, left_keys
+    keep_build = how == "outer"
+    keep_probe = how == "outer" or how == ("right" if build_left else "left")
+    build_positions = []
+    probe_positions = []
+    index = _build(build_keys, multiple)
+    matched = bytearray(len(build_keys)) if keep_build else None
+    for probe, key in enumerate(probe_keys):
+        positions = None if _is_null(key, multiple) else index.get(key)
+        if positions:
+            for build in positions:
+                build_positions.append(build)
+                probe_positions.append(probe)
+                if keep_build:
+                    matched[build] = 1
+        elif keep_probe:
+            build_positions.append(None)
+            probe_positions.append(probe)
+    if keep_build:
+        for build, was_matched in enumerate(matched):
+            if not was_matched:
+                build_positions.append(build)
+                probe_positions.append(None)
+    if build_left:
+        return build_positions, probe_positions
+    return probe_positions, build_positions
+
+
+def _merge_pairs(left_keys, right_keys, how):
+    left_positions = []
+    right_positions = []
+    keep_left = how in ("left", "outer")
+    keep_right = how in ("right", "outer")
+    num_left = len(left_keys)
+    num_right = len(right_keys)
+    x = y = 0
+    while x < num_left and y < num_right:
+        left_key = left_keys[x]
+        right_key = right_keys[y]
+        if left_key < right_key:
+            if keep_left:
+                left_positions.append(x)
+                right_positions.append(None)
+            x += 1
+        elif right_key < left_key:
+            if keep_right:
+                left_positions.append(None)
+                right_positions.append(y)
+            y += 1
+        else:
+            x_end = x + 1
+            while x_end < num_left and left_keys[x_end] == left_key:
+                x_end += 1
+            y_end = y + 1
+            while y_end < num_right and right_keys[y_end] == right_key:
+                y_end += 1
+            for left in range(x, x_end):
+                for right in range(y, y_end):
+                    left_positions.append(left)
+                    right_positions.append(right)
+            x, y = x_end, y_end
+    if keep_left:
+        for left in range(x, num_left):
+            left_positions.append(left)
+            right_positions.append(None)
+    if keep_right:
+        for right in range(y, num_right):
+            left_positions.append(None)
+            right_positions.append(right)
+    return left_positions, right_positions
+
+
+def _gather(column, positions):
+    if None in positions:
+        return [column[x] if x is not None else None for x in positions]
+    if isinstance(column, TypedColumn):
+        return column.take(positions)
+    return [column[x] for x in positions]
+
+
+def _coalesce(left_column, right_column, left_positions, right_positions):
+    return [
+        left_column[x] if x is not None else right_column[y]
+        for x, y in zip(left_positions, right_positions)
+    ]
+
+
+def _check_name(name, columns):
+    if name in columns:
+        raise ValueError(
+            f"the joined table would have two {name} columns, pass other suffixes"
+        )
+
+
+def join(left, right, on, how="inner", suffixes=("_left", "_right")):
+    """Joins two tables on the values of the 'on' columns and returns a new
+    table. 'on' is a column name, a list of column names or a list of
+    (left column, right column) pairs. 'how' is one of inner, left, right,
+    outer, semi or anti. Keys are compared on their cleaned values and null
+    keys never match. When both tables are already sorted on the keys they
+    are merged, otherwise a hash table is built on one side. Columns present
+    on both sides get 'suffixes' appended unless they are shared keys, a
+    ValueError is raised when that still leaves two columns with one name."""
+    if how not in JOIN_TYPES:
+        raise ValueError(f"how must be one of {', '.join(JOIN_TYPES)}, not {how!r}")
+    left_on, right_on = _normalize_on(on)
+    if len(left_on) != len(right_on) or not left_on:
+        raise ValueError("on must name the same number of columns on both sides")
+    multiple = len(left_on) > 1
+    left_keys = _join_keys(left, left_on)
+    right_keys = _join_keys(right, right_on, left, left_on)
+
+    if how in ("semi", "anti"):
+        right_index = {key for key in right_keys if not _is_null(key, multiple)}
+        keep = how == "semi"
+        matches = [
+            not _is_null(key, multiple) and key in right_index for key in left_keys
+        ]
+        return left._take([x for x, match in enumerate(matches) if match == keep])
+
+    pairs = None
+    if _is_sorted(left_keys, multiple) and _is_sorted(right_keys, multiple):
+        try:
+            pairs = _merge_pairs(left_keys, right_keys, how)
+        except TypeError:
+            # keys that are left of different types on the two sides can't be
+            # ordered against each other but they can still be hashed
+            pass
+    if pairs is None:
+        pairs = _hash_pairs(left_keys, right_keys, how, multiple)
+    left_positions, right_positions = pairs
+
+    shared_keys = {
+        left_key
+        for left_key, right_key in zip(left_on, right_on)
+        if left_key == right_key
+    }
+    right_headers = [header for header in right.headers if header not in shared_keys]
+    collisions = set(left.headers).intersection(right_headers)
+    headers = []
+    columns = {}
+    column_types = {}
+    for header in left.headers:
+        name = f"{header}{suffixes[0]}" if header in collisions else header
+        _check_name(name, columns)
+        if header in shared_keys and how in ("right", "outer"):
+            columns[name] = _coalesce(
+                left._table_data[header],
+                right._table_data[header],
+                left_positions,
+                right_positions,
+            )
+        else:
+            columns[name] = _gather(left._table_data[header], left_positions)
+        headers.append(name)
+        column_types[name] = left.column_types.get(header)
+    for header in right_headers:
+        name = f"{header}{suffixes[1]}" if header in collisions else header
+        _check_name(name, columns)
+        columns[name] = _gather(right._table_data[header], right_positions)
+        headers.append(name)
+        column_types[name] = right.column_types.get(header)
+    return tables.DictOfListsTable(
+        columns, headers, None, column_types, left.name, left._settings
+    )
@@ -14,10 +14,18 @@ class Row(object):
         "_parent",
         "_i",
         "_settings",
+        "_converters",
     )
 
     def __init__(
-        self, cells, headers, column_types, row_num, parent, settings=None
+        self,
+        cells,
+        headers,
+        column_types,
+        row_num,
+        parent,
+        settings=None,
+        converters=None,
     ):
         self.cells = cells
         self.headers = headers
@@ -25,6 +33,7 @@ class Row(object):
         self.row_num = row_num
         self._parent = parent
         self._settings = settings or Settings()
+        self._converters = converters or {}
         self._i = 0
 
     def index(self, item):
@@ -72,18 +81,38 @@ class Row(object):
     def replace(self, old, new):
         for x, cell in enumerate(self.cells):
             self.cells[x] = c.Cell(
-                self.cells[x], self.headers[x], self.row_num, x, self, self._settings
+                self.cells[x],
+                self.headers[x],
+                self.row_num,
+                x,
+                self,
+                self._settings,
+                converter=self._converters.get(self.headers[x]),
             ).replace(old, new)
 
     def get_cell(self, x):
         if isinstance(x, str):
             index = self.headers.index(x)
             return c.Cell(
-                self.cells[index], x, self.row_num, index, self, self._settings
+                self.cells[index],
+                x,
+                self.row_num,
+                index,
+                self,
+                self._settings,
+                converter=self._converters.get(x),
             )
         elif isinstance(x, int):
             header = self.headers[x]
-            return c.Cell(self.cells[x], header, self.row_num, x, self, self._settings)
+            return c.Cell(
+                self.cells[x],
+                header,
+                self.row_num,
+                x,
+                self,
+                self._settings,
+                converter=self._converters.get(header),
+            )
 
     def to_html(self, add_attr=None, row_total=False):
         if add_attr:
@@ -139,14 +168,14 @@ class Row(object):
             if key in self.headers:
                 self.cells[self.headers.index(key)] = value
                 if self._parent:
-                    self._parent.change_cell(key, self.row_num, value)
+                    self._parent.change_cell(self.row_num, key, value)
             else:
                 raise KeyError(f"'{key}'")
         elif isinstance(key, int):
             if key < len(self.cells):
                 self.cells[key] = value
                 if self._parent:
-                    self._parent.change_cell(self.headers[key], self.row_num, value)
+                    self._parent.change_cell(self.row_num, self.headers[key], value)
             else:
                 raise IndexError("assignment index out of range")
         else:
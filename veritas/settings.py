@@ -1,3 +1,19 @@
+from collections import namedtuple
+
+FormatOptions = namedtuple(
+    "FormatOptions",
+    [
+        "thousands_separator",
+        "decimal_point",
+        "currency_symbol",
+        "decimal_places",
+        "int_comma",
+        "dec_comma",
+        "float_comma",
+    ],
+)
+
+
 class Settings:
     def __init__(
         self,
@@ -16,6 +32,11 @@ class Settings:
         empty_string_is_none=False,
         clean_values=True,
         do_not_guess_types=False,
+        typed_columns=False,
+        thousands_separator=",",
+        decimal_point=".",
+        currency_symbol="$",
+        decimal_places=4,
     ):
         self.ignore_none = ignore_none
         self.datetime_format = datetime_format
@@ -32,3 +53,35 @@ class Settings:
         self.empty_string_is_none = empty_string_is_none
         self.clean_values = clean_values
         self.do_not_guess_types = do_not_guess_types
+        self.typed_columns = typed_columns
+        self.thousands_separator = thousands_separator
+        self.decimal_point = decimal_point
+        self.currency_symbol = currency_symbol
+        self.decimal_places = decimal_places
+
+    @classmethod
+    def from_conventions(cls, conventions, **kwargs):
+        """Returns Settings formatting numbers with the separators and currency
+        symbol of 'conventions', a dict like the one locale.localeconv()
+        returns. Reading them is left to the caller, the process locale is
+        never touched here."""
+        return cls(
+            thousands_separator=conventions["thousands_sep"],
+            decimal_point=conventions["decimal_point"],
+            currency_symbol=conventions["currency_symbol"],
+            **kwargs,
+        )
+
+    @property
+    def format_options(self):
+        """What the formatters of the cells need to know, see
+        util.compile_formatter"""
+        return FormatOptions(
+            self.thousands_separator,
+            self.decimal_point,
+            self.currency_symbol,
+            self.decimal_places,
+            self.int_comma,
+            self.dec_comma,
+            self.float_comma,
+        )
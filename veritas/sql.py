@@ -0,0 +1,146 @@
+from io import StringIO
+
+from .util import chunked
+
+IF_EXISTS = ("fail", "replace", "append")
+
+# escapes of the characters with a meaning in the text format of COPY
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# the SQLAlchemy type used for each column type when creating a table, any
+# other column type is stored as text
+SQL_TYPES = {
+    "integer": "Integer",
+    "bigint": "BigInteger",
+    "seconds": "BigInteger",
+    "numeric": "Numeric",
+    "money": "Numeric",
+    "percent": "Numeric",
+    "varchar": "Text",
+    "date": "Date",
+    "timestamp": "DateTime",
+    "time": "Time",
+    "interval": "Interval",
+    "bool": "Boolean",
+}
+
+
+def _sql_table(sqlalchemy, table, table_name, schema):
+    columns = [
+        sqlalchemy.Column(
+            field["name"], getattr(sqlalchemy, SQL_TYPES.get(field["type"], "Text"))
+        )
+        for field in table.field_definitions()
+    ]
+    return sqlalchemy.Table(table_name, sqlalchemy.MetaData(), *columns, schema=schema)
+
+
+def _placeholders(paramstyle, count):
+    """Returns the parameter markers of an insert for the paramstyle of the
+    driver and whether the parameters must be passed by name"""
+    if paramstyle == "qmark":
+        return ["?"] * count, False
+    if paramstyle == "numeric":
+        return [f":{x}" for x in range(1, count + 1)], False
+    if paramstyle == "named":
+        return [f":c{x}" for x in range(count)], True
+    if paramstyle == "pyformat":
+        return [f"%(c{x})s" for x in range(count)], True
+    return ["%s"] * count, False
+
+
+def _insert_rows(conn, sql_table, table, batch_size):
+    """Inserts the rows with one executemany per batch. The values are put
+    through the bind processors of the column types a column at a time, which
+    is what SQLAlchemy would do a row at a time."""
+    dialect = conn.dialect
+    preparer = dialect.identifier_preparer
+    columns = []
+    for header, column in zip(table.headers, sql_table.columns):
+        values = table._iter_typed(header)
+        processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+        columns.append(map(processor, values) if processor else values)
+    markers, named = _placeholders(dialect.paramstyle, len(columns))
+    statement = (
+        f"INSERT INTO {preparer.format_table(sql_table)} "
+        f"({', '.join(preparer.quote(header) for header in table.headers)}) "
+        f"VALUES ({', '.join(markers)})"
+    )
+    keys = [f"c{x}" for x in range(len(columns))]
+    for rows in chunked(zip(*columns), batch_size):
+        if named:
+            rows = [dict(zip(keys, row)) for row in rows]
+        conn.exec_driver_sql(statement, rows)
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _copy_rows(conn, sql_table, table, batch_size):
+    """Loads the rows with COPY FROM STDIN in its text format, one chunk per
+    batch"""
+    preparer = conn.dialect.identifier_preparer
+    statement = (
+        f"COPY {preparer.format_table(sql_table)} "
+        f"({', '.join(preparer.quote(header) for header in table.headers)}) "
+        "FROM STDIN"
+    )
+    columns = [map(_copy_value, table._iter_typed(header)) for header in table.headers]
+    cursor = conn.connection.cursor()
+    try:
+        for rows in chunked(zip(*columns), batch_size):
+            buffer = StringIO()
+            buffer.writelines("\t".join(row) + "\n" for row in rows)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def _write(sqlalchemy, conn, table, table_name, if_exists, batch_size, schema):
+    sql_table = _sql_table(sqlalchemy, table, table_name, schema)
+    if sqlalchemy.inspect(conn).has_table(table_name, schema=schema):
+        if if_exists == "fail":
+            raise ValueError(f"table {table_name} already exists")
+        if if_exists == "replace":
+            sql_table.drop(conn)
+            sql_table.create(conn)
+    else:
+        sql_table.create(conn)
+    if not table.num_rows:
+        return
+    if conn.dialect.driver == "psycopg2":
+        _copy_rows(conn, sql_table, table, batch_size)
+    else:
+        _insert_rows(conn, sql_table, table, batch_size)
+
+
+def to_sql(table, bind, table_name, if_exists="fail", batch_size=10000, schema=None):
+    """Writes a table to a database through a SQLAlchemy engine or connection.
+    The table is created from field_definitions() when it doesn't exist and
+    'if_exists' says what to do when it does: fail, replace or append. Rows are
+    inserted with an executemany per 'batch_size' rows, or loaded with COPY
+    when the driver is psycopg2, all in one transaction. A connection already
+    in a transaction is left for the caller to commit."""
+    if if_exists not in IF_EXISTS:
+        raise ValueError(
+            f"if_exists must be one of {', '.join(IF_EXISTS)}, not {if_exists!r}"
+        )
+    try:
+        # noinspection PyUnresolvedReferences
+        import sqlalchemy
+    except ImportError:
+        print("sqlalchemy is required in order to write a table to a database")
+        raise
+    args = (table, table_name, if_exists, batch_size, schema)
+    if isinstance(bind, sqlalchemy.engine.Engine):
+        with bind.begin() as conn:
+            _write(sqlalchemy, conn, *args)
+    elif bind.in_transaction():
+        _write(sqlalchemy, bind, *args)
+    else:
+        with bind.begin():
+            _write(sqlalchemy, bind, *args)
@@ -0,0 +1,206 @@
+from array import array
+from collections.abc import MutableSequence
+
+# the standardized column types with a compact representation, numeric
+# columns keep their Decimals in a list so they stay exact
+TYPECODES = {
+    "integer": "q",
+    "seconds": "q",
+    "bool": "b",
+}
+
+_PYTYPES = {"q": int, "b": bool}
+
+_NUMPY_DTYPES = {"q": "int64", "b": "bool"}
+
+
+class TypedColumn(MutableSequence):
+    """A list-like column that keeps its values unboxed in an array.array and
+    tracks missing values in a separate null mask. The mask is only created
+    once the first null shows up so fully populated columns cost exactly one
+    machine word per value. Values are handed back as plain Python objects
+    with None for nulls. Only the integer, seconds and bool column types are
+    stored this way, see TYPECODES."""
+
+    __slots__ = ("column_type", "converter", "_values", "_nulls", "_pytype")
+
+    def __init__(self, column_type, values=(), converter=None):
+        typecode = TYPECODES[column_type]
+        self.column_type = column_type
+        self.converter = converter
+        self._values = array(typecode)
+        self._nulls = None
+        self._pytype = _PYTYPES[typecode]
+        self.extend(values)
+
+    @property
+    def typecode(self):
+        return self._values.typecode
+
+    @property
+    def nbytes(self):
+        nbytes = self._values.itemsize * len(self._values)
+        if self._nulls is not None:
+            nbytes += len(self._nulls)
+        return nbytes
+
+    @property
+    def null_count(self):
+        if self._nulls is None:
+            return 0
+        return self._nulls.count(1)
+
+    def _coerce(self, value):
+        if value is None or value == "":
+            return None
+        if type(value) is self._pytype:
+            return value
+        if self.converter:
+            value = self.converter(value)
+            if value is None or value == "":
+                return None
+        if isinstance(value, str):
+            value = value.replace(",", "")
+            if self._pytype is int:
+                return int(value)
+            return value.lower() not in ("false", "0")
+        return self._pytype(value)
+
+    def _ensure_nulls(self):
+        if self._nulls is None:
+            self._nulls = bytearray(len(self._values))
+        return self._nulls
+
+    def append(self, value):
+        value = self._coerce(value)
+        if value is None:
+            self._ensure_nulls().append(1)
+            self._values.append(0)
+        else:
+            if self._nulls is not None:
+                self._nulls.append(0)
+            self._values.append(value)
+
+    def extend(self, values):
+        if isinstance(values, TypedColumn) and values.typecode == self.typecode:
+            if values._nulls is not None:
+                self._ensure_nulls().extend(values._nulls)
+            elif self._nulls is not None:
+                self._nulls.extend(bytes(len(values)))
+            self._values.extend(values._values)
+            return
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        start = len(self._values)
+        try:
+            self._values.extend(values)
+        except (TypeError, OverflowError):
+            del self._values[start:]
+        else:
+            if self._nulls is not None:
+                self._nulls.extend(bytes(len(values)))
+            return
+        for value in values:
+            self.append(value)
+
+    def insert(self, index, value):
+        value = self._coerce(value)
+        if value is None:
+            self._ensure_nulls().insert(index, 1)
+            self._values.insert(index, 0)
+        else:
+            if self._nulls is not None:
+                self._nulls.insert(index, 0)
+            self._values.insert(index, value)
+
+    def take(self, positions):
+        """Returns a new column holding the values at the given positions"""
+        column = TypedColumn(self.column_type, converter=self.converter)
+        values = self._values
+        column._values = array(self.typecode, [values[x] for x in positions])
+        if self._nulls is not None:
+            nulls = self._nulls
+            column._nulls = bytearray([nulls[x] for x in positions])
+        return column
+
+    def sum(self):
+        if self._nulls is None or not self._nulls.count(1):
+            return sum(self._values)
+        return sum(value for value, null in zip(self._values, self._nulls) if not null)
+
+    def to_numpy(self):
+        try:
+            # noinspection PyUnresolvedReferences
+            import numpy
+        except ImportError:
+            print("numpy is required in order to convert a column to an ndarray")
+            raise
+        values = numpy.array(self._values, dtype=_NUMPY_DTYPES[self.typecode])
+        if self._nulls is None:
+            return values
+        return numpy.ma.MaskedArray(values, mask=numpy.array(self._nulls, dtype=bool))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.take(range(len(self._values))[item])
+        if self._nulls is not None and self._nulls[item]:
+            return None
+        if self._pytype is bool:
+            return bool(self._values[item])
+        return self._values[item]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            positions = range(len(self._values))[key]
+            value = list(value)
+            if len(value) != len(positions):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(value)} "
+                    f"to slice of size {len(positions)}"
+                )
+            for position, item in zip(positions, value):
+                self[position] = item
+            return
+        value = self._coerce(value)
+        if value is None:
+            self._ensure_nulls()[key] = 1
+            self._values[key] = 0
+        else:
+            if self._nulls is not None:
+                self._nulls[key] = 0
+            self._values[key] = value
+
+    def __delitem__(self, item):
+        del self._values[item]
+        if self._nulls is not None:
+            del self._nulls[item]
+
+    def __iter__(self):
+        if self._nulls is None or not self._nulls.count(1):
+            if self._pytype is bool:
+                return map(bool, self._values)
+            return iter(self._values)
+        return self._iter_with_nulls()
+
+    def _iter_with_nulls(self):
+        box = bool if self._pytype is bool else None
+        for value, null in zip(self._values, self._nulls):
+            if null:
+                yield None
+            elif box:
+                yield box(value)
+            else:
+                yield value
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, (TypedColumn, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__}({self.column_type}) Cells: {list(self)}>"
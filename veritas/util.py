@@ -1,29 +1,42 @@
-import copy
-import html
-import locale
+import codecs
 import re
 from collections import OrderedDict, defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from html.parser import HTMLParser
+from itertools import islice
 from pathlib import Path
 
+from .settings import Settings
 
-def min_aggr(old, new, _):
-    if new < old:
+try:
+    # noinspection PyUnresolvedReferences
+    from dateutil.parser import parse as _dateutil_parse
+except ImportError:
+    _dateutil_parse = None
+
+ASC = "asc"
+DESC = "desc"
+
+
+def min_aggr(old, new, n):
+    if n == 1 or new < old:
         return new
     else:
         return old
 
 
-def max_aggr(old, new, _):
-    if new > old:
+def max_aggr(old, new, n):
+    if n == 1 or new > old:
         return new
     else:
         return old
 
 
-def product_aggr(old, new, _):
+def product_aggr(old, new, n):
+    if n == 1:
+        return new
     return old * new
 
 
@@ -39,96 +52,249 @@ def sum_aggr(old, new, _):
     return old + new
 
 
-def clean_value(value, type_desc, settings):
-    if value and settings.clean_values:
-        value = str(value)
-        type_desc = str(type_desc).lower()
-        if value == "-" and ("str" not in type_desc or "varchar" not in type_desc):
+CONVERTERS = {}
+
+
+def register_converter(*type_descs):
+    """Registers a converter factory for one or more column types. The factory
+    is given the Settings of the table and returns a function that cleans a
+    single value of that type."""
+
+    def decorator(factory):
+        for type_desc in type_descs:
+            CONVERTERS[type_desc] = factory
+        return factory
+
+    return decorator
+
+
+def _cleaner(parse, settings, *fast_types):
+    empty_string_is_none = settings.empty_string_is_none
+
+    def convert(value):
+        if type(value) in fast_types:
+            return value
+        if value:
+            value = str(value)
+            if value == "-":
+                return None
+            return parse(value)
+        if value == "" and empty_string_is_none:
             return None
-        if (
-            type_desc == "integer"
-            or type_desc == "int"
-            or type_desc == "bigint"
-            or type_desc == "seconds"
-        ):
-            return int(value.replace(",", ""))
-        elif type_desc == "float":
-            return float(value.replace(",", ""))
-        elif type_desc == "percent":
-            value = Decimal(value.replace(",", "").replace("%", ""))
-            if settings.divide_percent:
-                value = value / 100
+        return value
+
+    return convert
+
+
+def _text_converter(settings):
+    empty_string_is_none = settings.empty_string_is_none
+
+    def convert(value):
+        if value:
+            value = str(value)
+            if value == "-":
+                return None
             return value
-        elif type_desc == "money":
-            return Decimal(value.replace(",", "").replace("$", ""))
-        elif type_desc == "decimal" or type_desc == "numeric":
-            return Decimal(value)
-        elif type_desc == "bool":
-            if isinstance(value, str):
-                if value.lower() == "false":
-                    value = False
-                elif value.lower() == "true":
-                    value = True
-            return bool(value)
-        elif type_desc == "date":
-            return parse_date_time_string(value, settings.date_format)
-        elif type_desc == "time":
-            return parse_date_time_string(value, settings.time_format)
-        elif type_desc == "interval":
-            return parse_date_time_string(value)
-        elif type_desc == "timestamp":
-            return parse_date_time_string(value, settings.datetime_format)
-    elif value == "":
-        if settings.empty_string_is_none:
+        if value == "" and empty_string_is_none:
             return None
-    return value
+        return value
+
+    return convert
+
+
+@register_converter("integer", "int", "bigint", "seconds")
+def _integer_converter(settings):
+    return _cleaner(lambda value: int(value.replace(",", "")), settings, int)
+
+
+@register_converter("float")
+def _float_converter(settings):
+    return _cleaner(lambda value: float(value.replace(",", "")), settings, float)
+
+
+@register_converter("percent")
+def _percent_converter(settings):
+    divide_percent = settings.divide_percent
+
+    def parse(value):
+        value = Decimal(value.replace(",", "").replace("%", ""))
+        if divide_percent:
+            value = value / 100
+        return value
+
+    return _cleaner(parse, settings)
+
+
+@register_converter("money")
+def _money_converter(settings):
+    return _cleaner(
+        lambda value: Decimal(value.replace(",", "").replace("$", "")), settings
+    )
+
+
+@register_converter("decimal", "numeric")
+def _decimal_converter(settings):
+    return _cleaner(Decimal, settings, Decimal)
 
 
-def format_value(value, type_desc, str_format=None):
+@register_converter("bool")
+def _bool_converter(settings):
+    def parse(value):
+        if value.lower() == "false":
+            return False
+        elif value.lower() == "true":
+            return True
+        return bool(value)
+
+    return _cleaner(parse, settings, bool)
+
+
+@register_converter("date")
+def _date_converter(settings):
+    parser = DateTimeParser(settings.date_format)
+    return _cleaner(parser.parse, settings, datetime, date)
+
+
+@register_converter("time")
+def _time_converter(settings):
+    parser = DateTimeParser(settings.time_format)
+    return _cleaner(parser.parse, settings, datetime, time)
+
+
+@register_converter("timestamp")
+def _timestamp_converter(settings):
+    parser = DateTimeParser(settings.datetime_format)
+    return _cleaner(parser.parse, settings, datetime)
+
+
+@register_converter("interval")
+def _interval_converter(settings):
+    return _cleaner(parse_date_time_string, settings, timedelta)
+
+
+def compile_converter(type_desc, settings):
+    """Returns a function that cleans values of the given column type. The type
+    dispatch and settings lookups happen once here instead of once per value
+    like they would when calling clean_value."""
+    if not settings.clean_values:
+        empty_string_is_none = settings.empty_string_is_none
+
+        def convert(value):
+            if value == "" and empty_string_is_none:
+                return None
+            return value
+
+        return convert
+    factory = CONVERTERS.get(str(type_desc).lower(), _text_converter)
+    return factory(settings)
+
+
+def clean_value(value, type_desc, settings):
+    return compile_converter(type_desc, settings)(value)
+
+
+@lru_cache(maxsize=128)
+def compile_formatter(type_desc, str_format=None, options=None):
+    """Returns a function that formats a single cleaned value of 'type_desc'
+    the way format_value does, working out how only once per column. The
+    separators and currency symbol come from 'options', the format_options of
+    the Settings, and never from the locale of the process."""
+    if options is None:
+        options = Settings().format_options
     type_desc = str(type_desc).lower()
-    if value is not None:
-        if (
-            type_desc == "integer"
-            or type_desc == "int"
-            or type_desc == "bigint"
-            or type_desc == "seconds"
-        ):
-            return locale.format_string("%d", value, grouping=True)
-        elif type_desc == "float" or type_desc == "decimal" or type_desc == "numeric":
-            return (
-                locale.format_string(
-                    "%.4f", Decimal(str(value).replace(",", "")), grouping=True
-                )
-                .rstrip("0")
-                .rstrip(".")
-            )
-        elif type_desc == "percent":
-            value = value * 100
-            s = str(value)
-            v = (
-                locale.format_string(
-                    "%g", Decimal(s.rstrip("0").rstrip(".")), grouping=True
-                )
-                if "." in s
-                else locale.format_string("%g", Decimal(s), grouping=True)
-            )
-            return f"{v}%"
-        elif type_desc == "money":
+    if (
+        type_desc == "integer"
+        or type_desc == "int"
+        or type_desc == "bigint"
+        or type_desc == "seconds"
+    ):
+        spec = ",d" if options.int_comma else "d"
+
+        def format_(value):
+            return format(int(value), spec)
+
+    elif type_desc == "float" or type_desc == "decimal" or type_desc == "numeric":
+        comma = options.float_comma if type_desc == "float" else options.dec_comma
+        spec = f"{',' if comma else ''}.{options.decimal_places}f"
+
+        def format_(value):
+            if isinstance(value, str):
+                value = Decimal(value.replace(",", ""))
+            text = format(value, spec)
+            if "." in text:
+                return text.rstrip("0").rstrip(".")
+            return text
+
+    elif type_desc == "percent":
+        spec = ",g" if options.dec_comma else "g"
+
+        def format_(value):
+            if isinstance(value, str):
+                return value
+            return f"{format(float(value * 100), spec)}%"
+
+    elif type_desc == "money":
+        symbol = options.currency_symbol
+
+        def format_(value):
             if value < 0:
-                result = f"-{locale.currency(abs(value), grouping=True)}"
-            else:
-                result = locale.currency(value, grouping=True)
-            return result
-        elif type_desc == "date":
-            if "month" in type_desc:
-                return value.strftime("%m/%Y")
-            elif "quarter" in type_desc:
-                return datetime_to_quarter(value)
-            else:
-                return value.strftime("%m/%d/%Y")
-        elif type_desc == "timestamp" or type_desc == "time" or type_desc == "interval":
+                return f"-{symbol}{format(-value, ',.2f')}"
+            return f"{symbol}{format(value, ',.2f')}"
+
+    elif type_desc == "date":
+
+        def format_(value):
+            return value.strftime("%m/%d/%Y")
+
+    elif type_desc == "timestamp" or type_desc == "time" or type_desc == "interval":
+
+        def format_(value):
             return value.strftime(str_format)
-    return str(value)
+
+    else:
+        return str
+
+    if type_desc not in ("date", "timestamp", "time", "interval") and (
+        options.thousands_separator != "," or options.decimal_point != "."
+    ):
+        separators = str.maketrans(
+            {",": options.thousands_separator, ".": options.decimal_point}
+        )
+        format_number = format_
+
+        def format_(value):
+            return format_number(value).translate(separators)
+
+    def formatter(value):
+        if value is None:
+            return "None"
+        try:
+            return format_(value)
+        except (TypeError, ValueError, ArithmeticError, AttributeError):
+            # values the cleaning couldn't convert are shown as they are
+            return str(value)
+
+    return formatter
+
+
+def format_value(value, type_desc, str_format=None, options=None):
+    return compile_formatter(type_desc, str_format, options)(value)
+
+
+def is_null(value):
+    """Blanks count as missing values just like None"""
+    return value is None or value == ""
+
+
+def decimal_sum(values):
+    """Adds up the numbers among 'values' as a Decimal, skipping anything else"""
+    total = Decimal(0)
+    for value in values:
+        if isinstance(value, float):
+            total += Decimal(str(value))
+        elif isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+            total += value
+    return total
 
 
 def cast(value):
@@ -140,6 +306,58 @@ def cast(value):
         return "str"
 
 
+class MemoDict(dict):
+    """A dict that fills in missing keys by calling 'func' with the key"""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+
+    def __missing__(self, key):
+        value = self[key] = self.func(key)
+        return value
+
+
+def json_default(value):
+    """Turns the values the json module doesn't know about into JSON types"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_tokens(values, encode):
+    """Encodes every one of 'values' on its own with 'encode'. The json module
+    can only write a Decimal as a float or a string, so finite Decimals are
+    written as bare numbers with all their digits instead."""
+    for value in values:
+        if isinstance(value, Decimal) and value.is_finite():
+            yield str(value)
+        else:
+            yield encode(value)
+
+
+def chunked(iterable, size):
+    """Returns an iterator over lists of up to 'size' items from 'iterable'.
+    A size below 1 raises ValueError right away rather than once iterated."""
+    if size < 1:
+        raise ValueError(f"chunk size must be at least 1, not {size}")
+    return _chunks(iter(iterable), size)
+
+
+def _chunks(iterator, size):
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def get_sql_query_types(query):
     t = OrderedDict()
     for column in query.column_descriptions:
@@ -147,6 +365,26 @@ def get_sql_query_types(query):
     return t
 
 
+def get_result_types(result):
+    """Returns the column types of a SQLAlchemy result in column order, taken
+    from the selected columns of its statement or else from the type codes of
+    the cursor description. Types that can't be told are None."""
+    t = OrderedDict((str(key), None) for key in result.keys())
+    compiled = getattr(getattr(result, "context", None), "compiled", None)
+    statement = getattr(compiled, "statement", None)
+    for column in getattr(statement, "selected_columns", ()):
+        if column.name in t and not getattr(column.type, "_isnull", False):
+            t[column.name] = column.type
+    cursor = getattr(result, "cursor", None)
+    for description in getattr(cursor, "description", None) or ():
+        type_code = description[1]
+        if isinstance(type_code, type):
+            type_code = type_code.__name__
+        if t.get(description[0], 0) is None and isinstance(type_code, str):
+            t[description[0]] = type_code
+    return t
+
+
 def seconds_since_epoch(date_time):
     return (date_time - datetime(1970, 1, 1)).total_seconds()
 
@@ -166,10 +404,6 @@ def getindex(obj, item, default=0):
         return default
 
 
-def getindexes(obj, item):
-    return [index for index, value in enumerate(obj) if value == item]
-
-
 def rotate_clockwise(matrix, degree=90):
     if degree not in [0, 90, 180, 270, 360]:
         return
@@ -199,38 +433,6 @@ def find_duplicates(lst):
     return dups
 
 
-def merge_sort(array, index, key=None, reverse=False):
-    size = len(array)
-    if size < 2:
-        return array
-    if not key:
-        key = lambda x: x
-    middle = size // 2
-    left = merge_sort(array[:middle], index, key, reverse)
-    right = merge_sort(array[middle:], index, key, reverse)
-    left.reverse()
-    right.reverse()
-    result = []
-    while left and right:
-        if not reverse:
-            if key(left[-1][index]) <= key(right[-1][index]):
-                result.append(left.pop())
-            else:
-                result.append(right.pop())
-        else:
-            if key(left[-1][index]) >= key(right[-1][index]):
-                result.append(left.pop())
-            else:
-                result.append(right.pop())
-    left.reverse()
-    right.reverse()
-    if left:
-        result.extend(left)
-    if right:
-        result.extend(right)
-    return result
-
-
 def datetime_to_quarter(date_time):
     return "Q%s %s" % ((date_time.month - 1) // 3 + 1, date_time.year)
 
@@ -266,104 +468,355 @@ def parse_time_delta(s):
 
 def parse_date_time_string(value, str_format=None):
     if isinstance(value, str):
-        try:
-            # noinspection PyUnresolvedReferences
-            from dateutil.parser import parse
-
-            value = parse(value)
-        except ImportError:
+        if _dateutil_parse is not None:
+            try:
+                value = _dateutil_parse(value)
+            except (ValueError, OverflowError):
+                pass
+        else:
             value = datetime.strptime(value, str_format)
+    return value
+
+
+# formats tried in order when working out the format of a date, time or
+# timestamp column, after the format from the settings and ISO 8601
+DATE_TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%m/%d/%y %I:%M %p",
+    "%m/%d/%y %H:%M:%S",
+    "%m/%d/%y %H:%M",
+    "%m/%d/%y",
+    "%m-%d-%Y",
+    "%m-%d-%y",
+    "%d-%b-%Y",
+    "%d-%b-%y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%H:%M:%S",
+    "%H:%M:%S.%f",
+    "%H:%M",
+    "%I:%M %p",
+    "%I:%M:%S %p",
+)
+
+_DATE_DIRECTIVES = ("%Y", "%y", "%m", "%d", "%b", "%B", "%j")
+
+
+class DateTimeParser(object):
+    """Parses the date, time and timestamp strings of one column. The format
+    of the first value is worked out and kept for the values after it, so
+    most values are read with a single strptime or fromisoformat. A value the
+    format doesn't fit makes it look for the format again and dateutil is
+    only used for values no known format fits. Repeated values are parsed
+    once. Like dateutil, values without a date are put on today's date.
+    None, blanks and values nothing can parse are returned as they are."""
+
+    __slots__ = ("formats", "_format", "parse")
+
+    def __init__(self, str_format=None, memo_size=4096):
+        self.formats = (str_format,) if str_format else ()
+        self.formats += tuple(f for f in DATE_TIME_FORMATS if f != str_format)
+        self._format = None
+        self.parse = lru_cache(maxsize=memo_size)(self._parse)
+
+    def _parse(self, value):
+        if not value:
+            return value
+        if self._format is not None:
+            try:
+                return self._strptime(value, self._format)
+            except ValueError:
+                pass
+        try:
+            parsed = datetime.fromisoformat(value)
         except ValueError:
             pass
-    return value
+        else:
+            self._format = "iso"
+            return parsed
+        for str_format in self.formats:
+            try:
+                parsed = self._strptime(value, str_format)
+            except ValueError:
+                continue
+            self._format = str_format
+            return parsed
+        if _dateutil_parse is not None:
+            try:
+                return _dateutil_parse(value)
+            except (ValueError, OverflowError):
+                pass
+        return value
+
+    @staticmethod
+    def _strptime(value, str_format):
+        if str_format == "iso":
+            return datetime.fromisoformat(value)
+        parsed = datetime.strptime(value, str_format)
+        if not any(directive in str_format for directive in _DATE_DIRECTIVES):
+            return datetime.combine(date.today(), parsed.time())
+        return parsed
 
 
 class HtmlParser(HTMLParser):
-    __slots__ = [
-        "html",
-        "_open_tags",
-        "_open_tag_attrs",
-        "_relevant_tags",
-        "_row_num",
-        "_col_num",
-        "_data",
-        "_hidden_rows",
-        "_td",
-    ]
+    """Reads every table of a document in a single pass. The document can be
+    fed in chunks of any size, each table is put in 'tables' as soon as its
+    closing tag is read. Spans are expanded while reading, cells of a colspan
+    are repeated across the row and cells of a rowspan carried down to the
+    rows below, and rows hidden with display: none or the hidden attribute
+    are left out. Nested tables are read as tables of their own."""
+
+    __slots__ = ["tables", "_stack", "_decoder"]
 
     def __init__(self):
         super().__init__()
-        self._open_tags = []
-        self._open_tag_attrs = []
-        self._relevant_tags = ("table", "thead", "tbody", "tfoot", "tr", "th", "td")
-        self._row_num = -1
-        self._col_num = -1
-        self._data = []
-        self._hidden_rows = []
-        self._td = {"table": {}, "headers": [], "footers": [], "column_types": {}}
+        self.tables = []
+        self._stack = []
+        self._decoder = None
+
+    def reset(self):
+        super().reset()
+        self.tables = []
+        self._stack = []
+        self._decoder = None
 
     def parse(self, htm):
+        """Returns the first table of 'htm'"""
+        tables = self.parse_all(htm)
+        if tables:
+            return tables[0]
+        return {"table": {}, "headers": [], "footers": [], "column_types": {}}
+
+    def parse_all(self, htm):
+        return list(self.iter_parse([htm]))
+
+    def iter_parse(self, chunks, encoding="utf-8"):
+        """Feeds the parser an iterable of chunks, such as a file or socket
+        read in blocks, and yields every table once it has been read. Chunks
+        of bytes are decoded incrementally with 'encoding'."""
         self.reset()
-        self.feed(htm)
-        return self._td
+        for chunk in chunks:
+            self.feed(chunk, encoding)
+            yield from self._pop_tables()
+        self.close()
+        yield from self._pop_tables()
+
+    def feed(self, data, encoding="utf-8"):
+        if isinstance(data, (bytes, bytearray)):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+            data = self._decoder.decode(data)
+        super().feed(data)
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._finish_table()
+
+    def _pop_tables(self):
+        tables = self.tables
+        self.tables = []
+        return tables
 
     def handle_starttag(self, tag, attrs):
-        if tag in self._relevant_tags:
-            self._open_tags.append(tag)
-            self._open_tag_attrs.append({key: value for key, value in attrs})
-            if "tbody" in self._open_tags:
-                if tag == "tr":
-                    self._row_num += 1
-                    self._col_num = -1
-                elif tag == "td":
-                    self._col_num += 1
+        if tag == "table":
+            self._stack.append(_HtmlTableState())
+            return
+        if not self._stack:
+            return
+        state = self._stack[-1]
+        if tag in ("td", "th"):
+            state.start_cell(dict(attrs))
+        elif tag == "tr":
+            state.start_row(dict(attrs))
+        elif tag in ("thead", "tbody", "tfoot"):
+            state.finish_row()
+            state.section = tag
 
     def handle_endtag(self, tag):
-        if tag in self._relevant_tags:
-            last_open_tag = self._open_tags[-1]
-            last_open_attrs = self._open_tag_attrs[-1]
-            if "tr" == last_open_tag:
-                for attr in last_open_attrs.values():
-                    if "display: none" in attr:
-                        self._hidden_rows.append(self._row_num)
-            if "thead" in self._open_tags:
-                if "th" == last_open_tag:
-                    self._data = "".join(self._data)
-                    if self._data == "":
-                        self._data = str(self._col_num)
-                    self._td["headers"].append(self._data)
-                    self._td["table"][self._data] = []
-                    self._data = []
-            elif "tfoot" in self._open_tags:
-                if "th" == last_open_tag:
-                    self._data = "".join(self._data)
-                    self._td["footers"].append(self._data)
-                    self._data = []
-            elif "tbody" in self._open_tags:
-                if "td" == last_open_tag:
-                    header = self._td["headers"][self._col_num]
-                    self._data = "".join(self._data)
-                    self._td["table"][header].append(self._data)
-                    if header not in self._td["column_types"]:
-                        self._td["column_types"][header] = last_open_attrs
-                    self._data = []
-            if tag == last_open_tag:
-                self._open_tags.pop()
-                self._open_tag_attrs.pop()
+        if not self._stack:
+            return
+        state = self._stack[-1]
+        if tag == "table":
+            self._finish_table()
+        elif tag in ("td", "th"):
+            state.finish_cell()
+        elif tag == "tr":
+            state.finish_row()
+        elif tag in ("thead", "tbody", "tfoot"):
+            state.finish_row()
+            state.section = None
 
     def handle_data(self, data):
-        self._data.append(data.strip())
+        if self._stack and self._stack[-1].cell is not None:
+            self._stack[-1].cell.append(data)
 
-    def handle_charref(self, ref):
-        self.handle_entityref("#" + ref)
-
-    def handle_entityref(self, ref):
-        self.handle_data(html.unescape(f"&{ref};"))
+    def _finish_table(self):
+        self.tables.append(self._stack.pop().to_table_data())
 
     def error(self, message):
         print(message)
 
 
+class _HtmlTableState(object):
+    """What HtmlParser knows of a table while reading it"""
+
+    __slots__ = (
+        "section",
+        "cell",
+        "headers",
+        "footers",
+        "columns",
+        "column_types",
+        "_cell_attrs",
+        "_row",
+        "_row_hidden",
+        "_row_section",
+        "_spans",
+        "_has_rows",
+    )
+
+    def __init__(self):
+        self.section = None
+        self.cell = None
+        self.headers = None
+        self.footers = None
+        self.columns = []
+        self.column_types = None
+        self._cell_attrs = None
+        self._row = None
+        self._row_hidden = False
+        self._row_section = None
+        # column position -> [rows left, text, attrs] of the rowspans that
+        # reach into the next rows
+        self._spans = {}
+        self._has_rows = False
+
+    def start_row(self, attrs):
+        self.finish_row()
+        style = attrs.get("style") or ""
+        self._row = []
+        self._row_hidden = "hidden" in attrs or "display:none" in style.replace(" ", "")
+        self._row_section = self.section
+
+    def start_cell(self, attrs):
+        self.finish_cell()
+        if self._row is None:
+            self.start_row({})
+        self.cell = []
+        self._cell_attrs = attrs
+
+    def finish_cell(self):
+        if self.cell is None:
+            return
+        text = "".join(self.cell).strip()
+        attrs = self._cell_attrs
+        self.cell = None
+        self._place_spanned()
+        colspan = _span(attrs.pop("colspan", None))
+        rowspan = _span(attrs.pop("rowspan", None))
+        for _ in range(colspan):
+            if rowspan > 1:
+                self._spans[len(self._row)] = [rowspan - 1, text, attrs]
+            self._row.append((text, attrs))
+            self._place_spanned()
+
+    def _place_spanned(self):
+        spans = self._spans
+        row = self._row
+        while len(row) in spans:
+            span = spans[len(row)]
+            row.append((span[1], span[2]))
+            span[0] -= 1
+            if not span[0]:
+                del spans[len(row) - 1]
+
+    def finish_row(self):
+        self.finish_cell()
+        row = self._row
+        if row is None:
+            return
+        self._place_spanned()
+        # rowspans past the last cell of the row still fill their column
+        for position in sorted(self._spans):
+            while len(row) < position:
+                row.append(("", {}))
+            self._place_spanned()
+        self._row = None
+        section = self._row_section
+        if section == "tfoot":
+            if self.footers is None:
+                self.footers = [text for text, _ in row]
+        elif section == "thead" or (self.headers is None and not self._has_rows):
+            if self.headers is None:
+                self.headers = unique_headers(
+                    [text if text else str(x) for x, (text, _) in enumerate(row)]
+                )
+                self.columns = [[] for _ in self.headers]
+        elif not self._row_hidden:
+            self._add_row(row)
+
+    def _add_row(self, row):
+        self._has_rows = True
+        if self.headers is None:
+            self.headers = [str(x) for x in range(len(row))]
+            self.columns = [[] for _ in self.headers]
+        if self.column_types is None:
+            self.column_types = []
+            for x in range(len(self.headers)):
+                classes = (row[x][1].get("class") or "").split() if x < len(row) else []
+                self.column_types.append(classes[0] if classes else "string")
+        for x, column in enumerate(self.columns):
+            column.append(row[x][0] if x < len(row) else None)
+
+    def to_table_data(self):
+        self.finish_row()
+        headers = self.headers or []
+        column_types = self.column_types or ["string"] * len(headers)
+        return {
+            "table": dict(zip(headers, self.columns)),
+            "headers": headers,
+            "footers": self.footers or [],
+            "column_types": dict(zip(headers, column_types)),
+        }
+
+
+def unique_headers(headers):
+    """Returns 'headers' with a _2, _3... suffix added to every repeat of a
+    header, as a header spanning several columns gives one per column"""
+    seen = set(headers)
+    counts = {}
+    result = []
+    for header in headers:
+        if header in counts:
+            count = counts[header]
+            name = f"{header}_{count}"
+            while name in seen:
+                count += 1
+                name = f"{header}_{count}"
+            counts[header] = count + 1
+            seen.add(name)
+            header = name
+        else:
+            counts[header] = 2
+        result.append(header)
+    return result
+
+
+def _span(value):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
 class BeautifulSoupParser(object):
     def __init__(self, parser="html.parser"):
         self.soup = None
@@ -409,7 +862,7 @@ class BeautifulSoupParser(object):
     def normalize_html(self):
         table = self.soup.find("table")
         header_trs = table.find_all("tr")
-        while table.find(colspan=True) or table.find(rowspan=True):
+        if table.find(colspan=True) or table.find(rowspan=True):
             self.clean_spans()
         if not table.find("thead"):
             header_trs[0].wrap(self.soup.new_tag("thead"))
@@ -430,31 +883,63 @@ class BeautifulSoupParser(object):
                 th.name = "th"
 
     def clean_spans(self):
-        header_trs = self.soup.find("table").find_all("tr")
-        for x, tr in enumerate(header_trs):
-            cells = tr.select("th, td")
-            for y, ele in enumerate(cells):
-                if ele.has_attr("colspan"):
-                    colspan = int(ele.attrs.pop("colspan"))
-                    if colspan > 1:
-                        new_tag = self.soup.new_tag(ele.name)
-                        new_tag.string = ele.text
-                        new_tag.attrs = ele.attrs
-                        for _ in range(1, colspan):
-                            tr.insert(y, copy.copy(new_tag))
-                if ele.has_attr("rowspan"):
-                    rowspan = int(ele.attrs.pop("rowspan"))
+        """Expands the colspans and rowspans of the table in one pass over its
+        rows. A spanned cell is copied into every position it covers, the
+        rowspans still reaching into the next rows are kept per column."""
+        table = self.soup.find("table")
+        pending = {}
+        for tr in table.find_all("tr"):
+            if tr.find_parent("table") is not table:
+                continue
+            position = 0
+            last = None
+            for cell in tr.find_all(["th", "td"], recursive=False):
+                while position in pending:
+                    spanned = self._fill_span(pending, position)
+                    cell.insert_before(spanned)
+                    position += 1
+                colspan = self._pop_span(cell, "colspan")
+                rowspan = self._pop_span(cell, "rowspan")
+                last = cell
+                for x in range(colspan):
+                    if x:
+                        copied = self._copy_cell(cell)
+                        last.insert_after(copied)
+                        last = copied
                     if rowspan > 1:
-                        new_tag = self.soup.new_tag(ele.name)
-                        new_tag.string = ele.text
-                        new_tag.attrs = ele.attrs
-                        for z in range(1, rowspan):
-                            self.soup.find_all("tr")[x + z : x + z + 1][0].insert(
-                                y, copy.copy(new_tag)
-                            )
+                        pending[position] = [rowspan - 1, cell]
+                    position += 1
+            # rowspans past the last cell of the row still fill their column
+            for column in sorted(key for key in pending if key >= position):
+                while position < column:
+                    tr.append(self.soup.new_tag("td"))
+                    position += 1
+                tr.append(self._fill_span(pending, column))
+                position += 1
+
+    def _fill_span(self, pending, position):
+        span = pending[position]
+        span[0] -= 1
+        if not span[0]:
+            del pending[position]
+        return self._copy_cell(span[1])
+
+    def _copy_cell(self, cell):
+        new_tag = self.soup.new_tag(cell.name, attrs=dict(cell.attrs))
+        new_tag.string = cell.text
+        return new_tag
+
+    @staticmethod
+    def _pop_span(cell, attr):
+        try:
+            return max(int(cell.attrs.pop(attr, 1)), 1)
+        except ValueError:
+            return 1
 
 
 def open_xls_as_xlsx(filename):
+    """Copies an xls file into an xlsx file next to it. XlsTable reads an xls
+    file directly and should be preferred when only a table is needed."""
     try:
         # noinspection PyUnresolvedReferences
         import xlrd
@@ -475,7 +960,7 @@ def open_xls_as_xlsx(filename):
             ncols = sheet.ncols
             index += 1
         book1 = Workbook()
-        sheet1 = book1.get_active_sheet()
+        sheet1 = book1.active
         for row in range(0, nrows):
             for col in range(0, ncols):
                 sheet1.cell(row=row + 1, column=col + 1).value = sheet.cell_value(